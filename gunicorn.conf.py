@@ -0,0 +1,40 @@
+"""
+Production server: gunicorn managing uvicorn workers that serve
+planetarium_service.asgi. Run it with
+
+    gunicorn -c gunicorn.conf.py planetarium_service.asgi:application
+
+Each worker runs an event loop, so the async endpoints under /api/async/
+serve many slow clients at once. Django's ASGIHandler runs every request
+in its own thread sensitive context, so synchronous DRF views run
+concurrently, each on a thread of its own. Database connections belong
+to a thread and would never be reused, so planetarium_service.asgi turns
+DB_POOL on unless it is set: each worker then holds at most
+DB_POOL_MAX_SIZE connections per database, requests beyond that wait up
+to DB_POOL_TIMEOUT for one, and WEB_CONCURRENCY * DB_POOL_MAX_SIZE must
+fit in Postgres' max_connections. With DB_POOL=0 every request opens a
+connection of its own and DB_CONN_MAX_AGE has no effect.
+
+/metrics reports the worker that answers the scrape only; run a single
+worker per scraped address when the metrics must add up.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(
+    os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1)
+)
+worker_class = "uvicorn.workers.UvicornWorker"
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+
+# recycle workers now and then to bound memory growth
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
@@ -7,6 +7,8 @@ from planetarium.models import (
     ShowSession,
     Reservation,
     Ticket,
+    SeatHold,
+    SessionRecurrence,
 )
 
 admin.site.register(ShowTheme)
@@ -15,3 +17,5 @@ admin.site.register(PlanetariumDome)
 admin.site.register(ShowSession)
 admin.site.register(Reservation)
 admin.site.register(Ticket)
+admin.site.register(SeatHold)
+admin.site.register(SessionRecurrence)
@@ -0,0 +1,267 @@
+"""
+Read-only endpoints served natively under ASGI with the async ORM.
+They answer and throttle like their DRF counterparts, without the
+catalog cache and conditional GET of the synchronous API.
+"""
+
+import base64
+import binascii
+import functools
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.http import HttpResponse
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.exceptions import (
+    APIException,
+    MethodNotAllowed,
+    NotAuthenticated,
+    NotFound,
+    Throttled,
+    ValidationError,
+)
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+from planetarium.models import (
+    ShowTheme,
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+)
+from planetarium.seat_map import (
+    acache_seat_map,
+    encode_bitmap,
+    get_seat_map_cache,
+    seat_map_cache_key,
+    unpack_bitmap,
+)
+from planetarium.serializers import (
+    ShowThemeSerializer,
+    AstronomyShowSerializer,
+    PlanetariumDomeSerializer,
+    ShowSessionListSerializer,
+    ShowSessionDetailSerializer,
+)
+from planetarium.views import (
+    AstronomyShowViewSet,
+    ShowSessionPagination,
+    ShowSessionViewSet,
+)
+from user.authentication import CachedJWTAuthentication
+
+
+def json_response(data, status_code=status.HTTP_200_OK, headers=None):
+    return HttpResponse(
+        JSONRenderer().render(data),
+        status=status_code,
+        content_type="application/json",
+        headers=headers,
+    )
+
+
+async def authenticate(request):
+    """Return the user of the request's access token, None without one"""
+    authentication = CachedJWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    return await authentication.aget_user(
+        authentication.get_validated_token(raw_token)
+    )
+
+
+def check_throttles(request, view):
+    """Raise Throttled when a throttle class of the API denies request"""
+    throttles = [
+        throttle_class()
+        for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES
+    ]
+    durations = [
+        throttle.wait()
+        for throttle in throttles
+        if not throttle.allow_request(request, view)
+    ]
+    if durations:
+        durations = [wait for wait in durations if wait is not None]
+        raise Throttled(max(durations, default=None))
+
+
+def async_api_view(view):
+    """
+    Allow authenticated and unthrottled GET requests and turn API
+    exceptions into JSON error responses like DRF does
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            if request.method not in ("GET", "HEAD"):
+                raise MethodNotAllowed(request.method)
+            request.user = await authenticate(request)
+            if request.user is None:
+                raise NotAuthenticated
+            # the throttle cache may be a blocking backend
+            await sync_to_async(check_throttles)(request, view)
+            return json_response(await view(request, *args, **kwargs))
+        except APIException as error:
+            detail = error.detail
+            if not isinstance(detail, (dict, list)):
+                detail = {"detail": detail}
+            headers = None
+            if getattr(error, "wait", None):
+                headers = {"Retry-After": "%d" % error.wait}
+            return json_response(detail, error.status_code, headers)
+
+    return wrapper
+
+
+async def get_or_404(queryset, pk):
+    try:
+        return await queryset.aget(pk=int(pk))
+    except (ValueError, queryset.model.DoesNotExist):
+        raise NotFound
+
+
+async def serialize_list(serializer_class, queryset):
+    return serializer_class([obj async for obj in queryset], many=True).data
+
+
+@async_api_view
+async def theme_list(request):
+    queryset = ShowTheme.objects.all()
+    if request.GET.get("name"):
+        queryset = queryset.filter(name__icontains=request.GET["name"])
+    return await serialize_list(ShowThemeSerializer, queryset)
+
+
+@async_api_view
+async def theme_detail(request, pk):
+    return ShowThemeSerializer(
+        await get_or_404(ShowTheme.objects.all(), pk)
+    ).data
+
+
+@async_api_view
+async def show_list(request):
+    queryset = AstronomyShow.objects.prefetch_related("themes")
+    if request.GET.get("q"):
+        queryset = AstronomyShowViewSet.search(queryset, request.GET["q"])
+    return await serialize_list(AstronomyShowSerializer, queryset)
+
+
+@async_api_view
+async def show_detail(request, pk):
+    return AstronomyShowSerializer(
+        await get_or_404(AstronomyShow.objects.prefetch_related("themes"), pk)
+    ).data
+
+
+@async_api_view
+async def dome_list(request):
+    return await serialize_list(
+        PlanetariumDomeSerializer, PlanetariumDome.objects.all()
+    )
+
+
+@async_api_view
+async def dome_detail(request, pk):
+    return PlanetariumDomeSerializer(
+        await get_or_404(PlanetariumDome.objects.all(), pk)
+    ).data
+
+
+def encode_cursor(session):
+    position = f"{session.show_time.isoformat()}|{session.id}"
+    return base64.urlsafe_b64encode(position.encode()).decode("ascii")
+
+
+def decode_cursor(cursor):
+    try:
+        show_time, pk = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        show_time, pk = parse_datetime(show_time), int(pk)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        show_time = None
+    if show_time is None:
+        raise ValidationError({"cursor": "Invalid cursor"})
+    return show_time, pk
+
+
+def page_size(params):
+    try:
+        size = int(params[ShowSessionPagination.page_size_query_param])
+    except (KeyError, ValueError):
+        return ShowSessionPagination.page_size
+    if size <= 0:
+        return ShowSessionPagination.page_size
+    return min(size, ShowSessionPagination.max_page_size)
+
+
+@async_api_view
+async def session_list(request):
+    """
+    Sessions in (show_time, id) order with the filters of the session
+    list, paginated by an opaque keyset cursor
+    """
+    params = request.GET
+    queryset = ShowSessionViewSet.filter_list(
+        ShowSessionViewSet.with_tickets_available(ShowSession.objects.all()),
+        params,
+    ).order_by("show_time", "id")
+    if params.get("cursor"):
+        show_time, pk = decode_cursor(params["cursor"])
+        queryset = queryset.filter(
+            Q(show_time__gt=show_time) | Q(show_time=show_time, id__gt=pk)
+        )
+
+    size = page_size(params)
+    sessions = [session async for session in queryset[: size + 1]]
+    next_url = None
+    if len(sessions) > size:
+        sessions = sessions[:size]
+        query = params.copy()
+        query["cursor"] = encode_cursor(sessions[-1])
+        next_url = request.build_absolute_uri(
+            f"{request.path}?{query.urlencode()}"
+        )
+    return {
+        "next": next_url,
+        "results": ShowSessionListSerializer(sessions, many=True).data,
+    }
+
+
+@async_api_view
+async def session_detail(request, pk):
+    return ShowSessionDetailSerializer(
+        await get_or_404(
+            ShowSessionViewSet.with_tickets_available(
+                ShowSession.objects.all()
+            ),
+            pk,
+        )
+    ).data
+
+
+@async_api_view
+async def session_seats(request, pk):
+    """Occupancy of every seat, like ShowSessionViewSet.seats"""
+    seat_map = await get_seat_map_cache().aget(seat_map_cache_key(pk))
+    if seat_map is None:
+        seat_map = await acache_seat_map(
+            await get_or_404(
+                ShowSession.objects.select_related("planetarium_dome"), pk
+            )
+        )
+    rows, seats_in_row = seat_map["rows"], seat_map["seats_in_row"]
+    data = {"id": int(pk), "rows": rows, "seats_in_row": seats_in_row}
+    if request.GET.get("encoding") == "json":
+        data["taken"] = unpack_bitmap(seat_map["bitmap"], rows, seats_in_row)
+    else:
+        data["bitmap"] = encode_bitmap(seat_map["bitmap"])
+    return data
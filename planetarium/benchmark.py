@@ -0,0 +1,376 @@
+import http.client
+import json
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit, parse_qs, quote
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.servers.basehttp import (
+    ThreadedWSGIServer,
+    WSGIRequestHandler,
+)
+from django.utils import timezone
+from rest_framework.throttling import SimpleRateThrottle
+
+# queries reported by planetarium.metrics.MetricsMiddleware
+SERVER_TIMING_QUERIES = re.compile(r'(?:^|,)\s*db;[^,]*desc="(\d+) queries"')
+
+
+def percentile(values, fraction):
+    """Linearly interpolated percentile of sorted values"""
+    if not values:
+        return None
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class Recorder:
+    """Thread-safe collection of (latency, status, queries) per route"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+
+    def add(self, label, elapsed, status, queries):
+        with self.lock:
+            self.samples[label].append((elapsed, status, queries))
+
+    def summary(self, elapsed):
+        endpoints = {}
+        for label, samples in sorted(self.samples.items()):
+            latencies = sorted(sample[0] * 1000 for sample in samples)
+            queries = [
+                sample[2] for sample in samples if sample[2] is not None
+            ]
+            statuses = Counter(str(sample[1]) for sample in samples)
+            endpoints[label] = {
+                "requests": len(samples),
+                "errors": sum(
+                    1 for sample in samples if not 0 < sample[1] < 500
+                ),
+                "statuses": dict(sorted(statuses.items())),
+                "throughput": round(len(samples) / elapsed, 2),
+                "mean_ms": round(sum(latencies) / len(latencies), 2),
+                "p50_ms": round(percentile(latencies, 0.50), 2),
+                "p95_ms": round(percentile(latencies, 0.95), 2),
+                "p99_ms": round(percentile(latencies, 0.99), 2),
+                "max_ms": round(latencies[-1], 2),
+                "queries": (
+                    round(sum(queries) / len(queries), 2) if queries else None
+                ),
+            }
+        requests = sum(endpoint["requests"] for endpoint in endpoints.values())
+        return {
+            "elapsed": round(elapsed, 3),
+            "requests": requests,
+            "throughput": round(requests / elapsed, 2),
+            "endpoints": endpoints,
+        }
+
+
+class Client:
+    """Keep-alive JSON client of one benchmark user"""
+
+    def __init__(self, url, recorder=None):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.recorder = recorder
+        self.connection = None
+        self.access = self.refresh = None
+
+    def request(self, method, route, data=None, auth=True, **params):
+        """
+        Send a request to route formatted with params, record it under
+        "METHOD route" and return (status, decoded body)
+        """
+        headers = {"Accept": "application/json"}
+        body = None
+        if data is not None:
+            body = json.dumps(data)
+            headers["Content-Type"] = "application/json"
+        if auth and self.access:
+            headers["Authorization"] = f"Bearer {self.access}"
+
+        started = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(
+                    self.host, self.port, timeout=60
+                )
+            self.connection.request(
+                method, route.format(**params), body, headers
+            )
+            response = self.connection.getresponse()
+            content = response.read()
+            status = response.status
+            queries = SERVER_TIMING_QUERIES.search(
+                response.getheader("Server-Timing", "")
+            )
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            content, status, queries = b"", 0, None
+        elapsed = time.perf_counter() - started
+
+        if self.recorder is not None:
+            self.recorder.add(
+                f"{method} {route}",
+                elapsed,
+                status,
+                int(queries[1]) if queries else None,
+            )
+        try:
+            return status, json.loads(content) if content else None
+        except ValueError:
+            return status, None
+
+    def login(self, email, password):
+        status, tokens = self.request(
+            "POST",
+            "/api/user/token/",
+            {"email": email, "password": password},
+            auth=False,
+        )
+        if status != 200:
+            raise RuntimeError(f"Cannot log in {email}: HTTP {status}")
+        self.access, self.refresh = tokens["access"], tokens["refresh"]
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+
+def browse(client, context, rnd):
+    """Catalog pages a visitor goes through before picking a show"""
+    client.request("GET", "/api/theme/")
+    client.request("GET", "/api/show/")
+    client.request(
+        "GET", "/api/show/?q={q}", q=rnd.choice(("star", "black+hole"))
+    )
+    client.request("GET", "/api/dome/")
+    if context["themes"]:
+        client.request(
+            "GET", "/api/theme/{id}/", id=rnd.choice(context["themes"])
+        )
+    if context["shows"]:
+        client.request(
+            "GET", "/api/show/{id}/", id=rnd.choice(context["shows"])
+        )
+    if context["domes"]:
+        client.request(
+            "GET", "/api/dome/{id}/", id=rnd.choice(context["domes"])
+        )
+
+
+def sessions(client, context, rnd):
+    """The schedule: session list pages, details and seat maps"""
+    status, page = client.request("GET", "/api/session/")
+    if status == 200 and page["next"]:
+        cursor = parse_qs(urlsplit(page["next"]).query)["cursor"][0]
+        client.request(
+            "GET", "/api/session/?cursor={cursor}", cursor=quote(cursor)
+        )
+    client.request(
+        "GET",
+        "/api/session/?date_from={date}",
+        date=timezone.localdate().isoformat(),
+    )
+    if context["sessions"]:
+        session_id = rnd.choice(context["sessions"])
+        client.request("GET", "/api/session/{id}/", id=session_id)
+        client.request("GET", "/api/session/{id}/seats/", id=session_id)
+        client.request(
+            "GET", "/api/session/{id}/seats/?encoding=json", id=session_id
+        )
+
+
+def account(client, context, rnd):
+    """Pages of a logged-in user"""
+    client.request("GET", "/api/user/me/")
+    client.request("GET", "/api/user/me/reservations/")
+    status, page = client.request("GET", "/api/reservation/")
+    if status == 200 and page["results"]:
+        client.request(
+            "GET",
+            "/api/reservation/{id}/",
+            id=rnd.choice(page["results"])["id"],
+        )
+    client.request("GET", "/api/ticket/")
+    client.request("GET", "/api/hold/")
+
+
+def booking(client, context, rnd):
+    """A burst of bookings, holds and checkouts on a single session"""
+    target = context["target"]
+    if target is None:
+        return
+    seats = list(
+        {
+            (
+                rnd.randint(1, target["rows"]),
+                rnd.randint(1, target["seats_in_row"]),
+            )
+            for _ in range(rnd.randint(1, 2))
+        }
+    )
+    data = {
+        "show_session": target["id"],
+        "seats": [{"row": row, "seat": seat} for row, seat in seats],
+    }
+    choice = rnd.random()
+    if choice < 0.5:
+        client.request("POST", "/api/ticket/book/", data)
+    elif choice < 0.75:
+        row, seat = seats[0]
+        client.request(
+            "POST",
+            "/api/ticket/",
+            {"show_session": target["id"], "row": row, "seat": seat},
+        )
+    else:
+        status, _ = client.request("POST", "/api/hold/", data)
+        if status == 201:
+            client.request(
+                "POST", "/api/hold/checkout/", {"show_session": target["id"]}
+            )
+    client.request("GET", "/api/session/{id}/seats/", id=target["id"])
+
+
+def auth(client, context, rnd):
+    """Token refresh and verification, logins and sign-ups"""
+    status, tokens = client.request(
+        "POST", "/api/user/token/refresh/", {"refresh": client.refresh}
+    )
+    if status == 200:
+        client.access = tokens["access"]
+    client.request("POST", "/api/user/token/verify/", {"token": client.access})
+    if rnd.random() < 0.1:
+        client.request(
+            "POST",
+            "/api/user/token/",
+            {"email": client.email, "password": context["password"]},
+            auth=False,
+        )
+        client.request(
+            "POST",
+            "/api/user/register/",
+            {
+                "email": context["new_email"](),
+                "password": context["password"],
+            },
+            auth=False,
+        )
+
+
+WORKLOADS = {
+    "browse": browse,
+    "sessions": sessions,
+    "account": account,
+    "booking": booking,
+    "auth": auth,
+}
+
+
+def run_workload(
+    workload, context, clients, rnd, duration=None, iterations=None
+):
+    """
+    Run workload from concurrent clients for duration seconds or for
+    iterations per client, return its summary
+    """
+    recorder = Recorder()
+    deadline = time.perf_counter() + (duration or 0)
+
+    def worker(client, seed):
+        worker_rnd = type(rnd)(seed)
+        client.recorder = recorder
+        done = 0
+        while (
+            done < iterations
+            if iterations is not None
+            else time.perf_counter() < deadline
+        ):
+            workload(client, context, worker_rnd)
+            done += 1
+        client.recorder = None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+        futures = [
+            executor.submit(worker, client, rnd.random()) for client in clients
+        ]
+        for future in futures:
+            future.result()
+    return recorder.summary(time.perf_counter() - started)
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def local_server():
+    """Serve the project from a threaded server on a free local port"""
+    server = ThreadedWSGIServer(("127.0.0.1", 0), QuietRequestHandler)
+    server.set_app(WSGIHandler())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+@contextmanager
+def raised_throttle_rates(rate="1000000/day"):
+    """Keep throttling in the request path without rejecting requests"""
+    rates = SimpleRateThrottle.THROTTLE_RATES
+    SimpleRateThrottle.THROTTLE_RATES = dict.fromkeys(rates, rate)
+    try:
+        yield
+    finally:
+        SimpleRateThrottle.THROTTLE_RATES = rates
+
+
+def compare(results, baseline, max_regression):
+    """
+    Return the routes whose p95 latency grew by more than max_regression
+    percent, or whose queries per request grew at all, since baseline
+    """
+    regressions = []
+    for name, workload in results["workloads"].items():
+        before = baseline.get("workloads", {}).get(name, {})
+        for label, endpoint in workload["endpoints"].items():
+            previous = before.get("endpoints", {}).get(label)
+            if previous is None:
+                continue
+            if previous["p95_ms"]:
+                growth = (
+                    (endpoint["p95_ms"] - previous["p95_ms"])
+                    / previous["p95_ms"]
+                    * 100
+                )
+                if growth > max_regression:
+                    regressions.append(
+                        f"{name} {label}: p95 {previous['p95_ms']}ms -> "
+                        f"{endpoint['p95_ms']}ms (+{growth:.0f}%)"
+                    )
+            if (
+                endpoint["queries"] is not None
+                and previous["queries"] is not None
+                and endpoint["queries"] > previous["queries"]
+            ):
+                regressions.append(
+                    f"{name} {label}: queries {previous['queries']} -> "
+                    f"{endpoint['queries']}"
+                )
+    return regressions
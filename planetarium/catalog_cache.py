@@ -0,0 +1,92 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from planetarium.conditional import ConditionalGetMixin
+from planetarium_service.db.replicas import use_primary
+
+CATALOG_CACHE = "catalog"
+
+
+def version_key(model):
+    return f"catalog:version:{model._meta.label_lower}"
+
+
+def get_versions(*models):
+    """Return the current version of every model, starting missing ones"""
+    cache = caches[CATALOG_CACHE]
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def _bump_versions(*models):
+    cache = caches[CATALOG_CACHE]
+    for model in models:
+        try:
+            cache.incr(version_key(model))
+        except ValueError:
+            cache.set(version_key(model), time.time_ns(), timeout=None)
+
+
+def bump_versions(*models):
+    """
+    Invalidate every cached response built from the models, now and once
+    more on commit, so nothing read before the commit outlives it
+    """
+    _bump_versions(*models)
+    transaction.on_commit(lambda: _bump_versions(*models))
+
+
+class CatalogCacheMixin(ConditionalGetMixin):
+    """
+    Serve list and retrieve responses, and their validators, from the
+    catalog cache, keyed by endpoint, query params and the versions of
+    cache_models
+    """
+
+    cache_models = ()
+
+    def get_cache_key(self, request):
+        if not hasattr(self, "_catalog_cache_key"):
+            versions = ":".join(map(str, get_versions(*self.cache_models)))
+            query = urlencode(sorted(request.query_params.lists()), doseq=True)
+            digest = hashlib.md5(
+                f"{request.path}?{query}".encode()
+            ).hexdigest()
+            self._catalog_cache_key = (
+                f"catalog:{self.basename}:{versions}:{digest}"
+            )
+        return self._catalog_cache_key
+
+    def get_validators(self, request):
+        cache = caches[CATALOG_CACHE]
+        key = f"{self.get_cache_key(request)}:validators"
+        validators = cache.get(key)
+        if validators is None:
+            with use_primary():
+                validators = super().get_validators(request)
+            cache.set(key, validators)
+        return validators
+
+    def build_response(self, handler, request, *args, **kwargs):
+        cache = caches[CATALOG_CACHE]
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        with use_primary():
+            response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data)
+        return response
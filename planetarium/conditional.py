@@ -0,0 +1,123 @@
+import datetime
+import hashlib
+
+from django.db.models import Count, Max, prefetch_related_objects
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+
+
+class ConditionalGetMixin:
+    """
+    Answer list and retrieve with ETag and Last-Modified headers and
+    return 304 Not Modified, without serializing, when the client's copy
+    is current. Validators are computed from etag_fields of the rows of
+    the requested page, or object, which list() then reuses. Lists
+    compare the maximum of each field, so etag_fields must be timestamps
+    that every change of the rendered data moves forward.
+    """
+
+    etag_fields = ("updated_at",)
+
+    def get_validator_values(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == "list":
+            page = self.paginate_queryset(queryset.prefetch_related(None))
+            if page is None:
+                return self.aggregate_validators(
+                    queryset.prefetch_related(None)
+                )
+            # list() serializes these rows, prefetching only then
+            self.validator_page = (page, queryset._prefetch_related_lookups)
+            pks = [row.pk for row in page]
+            return [
+                pks,
+                self.get_paginated_response([]).data,
+                self.aggregate_validators(
+                    queryset.model._default_manager.filter(pk__in=pks)
+                ),
+            ]
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            rows = list(
+                queryset.filter(
+                    **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+                )
+                .values_list(*self.etag_fields)
+                .order_by(*self.etag_fields)
+            )
+        except (TypeError, ValueError):
+            rows = []
+        return [value for row in rows for value in row] or None
+
+    def aggregate_validators(self, queryset):
+        return list(
+            queryset.aggregate(
+                count=Count("pk", distinct=True),
+                **{
+                    f"max_{index}": Max(field)
+                    for index, field in enumerate(self.etag_fields)
+                },
+            ).values()
+        )
+
+    def paginate_queryset(self, queryset):
+        if getattr(self, "validator_page", None) is None:
+            return super().paginate_queryset(queryset)
+        page, lookups = self.validator_page
+        prefetch_related_objects(page, *lookups)
+        return page
+
+    def get_validators(self, request):
+        """Return the (etag, last_modified) pair of the requested resource"""
+        values = self.get_validator_values(request)
+        if values is None:
+            return None, None
+
+        source = repr((self.basename, self.action, request.GET.urlencode()))
+        etag = hashlib.md5(f"{source}{values!r}".encode()).hexdigest()
+        timestamps = [
+            value.timestamp()
+            for value in values
+            if isinstance(value, datetime.datetime)
+        ]
+        last_modified = int(max(timestamps)) if timestamps else None
+        return f'"{etag}"', last_modified
+
+    def build_response(self, handler, request, *args, **kwargs):
+        return handler(request, *args, **kwargs)
+
+    def set_validator_headers(self, response, etag, last_modified):
+        response.headers["ETag"] = etag
+        if last_modified is not None:
+            response.headers["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        if etag is None:
+            return self.build_response(handler, request, *args, **kwargs)
+
+        not_modified = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            return self.set_validator_headers(
+                not_modified, etag, last_modified
+            )
+
+        response = self.build_response(handler, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            self.set_validator_headers(response, etag, last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
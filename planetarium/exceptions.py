@@ -0,0 +1,21 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class SeatsTaken(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Some of the seats are already taken."
+    default_code = "seats_taken"
+
+    def __init__(self, seats=(), detail=None, code=None):
+        super().__init__(detail, code)
+        self.detail = {
+            "detail": self.detail,
+            "seats": [{"row": row, "seat": seat} for row, seat in seats],
+        }
+
+
+class SessionsOverlap(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The session overlaps another session of its dome."
+    default_code = "sessions_overlap"
@@ -0,0 +1,44 @@
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from planetarium.exceptions import SeatsTaken
+from planetarium.models import SeatHold, seat_lookup
+
+
+def seat_lock_key(show_session_id, row, seat):
+    return (show_session_id << 24) | (row << 12) | seat
+
+
+def lock_seats(show_session_id, seats):
+    """
+    Take a transaction-level advisory lock per seat without waiting,
+    so buyers of different seats of one session never block each other.
+    Return False if another transaction is claiming one of the seats.
+    """
+    keys = [seat_lock_key(show_session_id, row, seat) for row, seat in seats]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT bool_and(pg_try_advisory_xact_lock(key)) "
+            "FROM unnest(%s::bigint[]) AS key",
+            [keys],
+        )
+        return cursor.fetchone()[0]
+
+
+def claim_seats(show_session_id, seats, user):
+    """
+    Lock the seats for the current transaction and drop their expired
+    holds and the user's own ones. Raise SeatsTaken if another user
+    holds any of them.
+    """
+    if not lock_seats(show_session_id, seats):
+        raise SeatsTaken(detail="Some of the seats are being booked.")
+
+    holds = SeatHold.objects.filter(show_session_id=show_session_id).filter(
+        seat_lookup(seats)
+    )
+    holds.filter(Q(expires_at__lte=timezone.now()) | Q(user=user)).delete()
+    held = list(holds.values_list("row", "seat"))
+    if held:
+        raise SeatsTaken(held)
@@ -0,0 +1,234 @@
+import contextlib
+import itertools
+import json
+import random
+import subprocess
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, CommandError
+from django.db.models import F
+from django.utils import timezone
+
+from planetarium.benchmark import (
+    WORKLOADS,
+    Client,
+    compare,
+    local_server,
+    raised_throttle_rates,
+    run_workload,
+)
+from planetarium.models import (
+    ShowTheme,
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Reservation,
+)
+
+PASSWORD = "benchmark-password"
+
+
+class Command(BaseCommand):
+    help = (
+        "Run scripted workloads from concurrent clients against the API "
+        "and report latency percentiles, throughput and SQL queries per "
+        "route. Without --url the project is served in-process, with "
+        "throttling raised out of the way; a server given by --url must "
+        "share this database and allow the traffic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url", help="Base URL of a running server, e.g. 127.0.0.1:8000"
+        )
+        parser.add_argument(
+            "--workload",
+            action="append",
+            choices=list(WORKLOADS),
+            help="Workload to run, may be repeated (default: all)",
+        )
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10.0,
+            help="Seconds to run each workload for",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            help="Iterations per client, instead of --duration",
+        )
+        parser.add_argument("--output", default="benchmark.json")
+        parser.add_argument(
+            "--compare", help="Results JSON of a previous run to compare to"
+        )
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            default=20.0,
+            help="Allowed p95 latency growth over --compare, in percent",
+        )
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        rnd = random.Random(options["seed"])
+        token = uuid.uuid4().hex[:8]
+        numbers = itertools.count()
+
+        def new_email():
+            return f"bench{next(numbers)}.{token}@bench.test"
+
+        password = make_password(PASSWORD)
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(email=new_email(), password=password)
+            for _ in range(options["concurrency"])
+        )
+        context = self.get_context()
+        context.update(password=PASSWORD, new_email=new_email)
+
+        url = options["url"]
+        server = (
+            contextlib.nullcontext(url.rstrip("/")) if url else local_server()
+        )
+        throttling = (
+            contextlib.nullcontext() if url else raised_throttle_rates()
+        )
+        try:
+            with server as base_url, throttling:
+                if "://" not in base_url:
+                    base_url = f"http://{base_url}"
+                results = self.run(base_url, users, context, rnd, options)
+        finally:
+            # leave the database as it was for the next run
+            benchmark_users = get_user_model().objects.filter(
+                email__endswith=f".{token}@bench.test"
+            )
+            Reservation.objects.filter(user__in=benchmark_users).delete()
+            benchmark_users.delete()
+
+        with open(options["output"], "w") as file:
+            json.dump(results, file, indent=2)
+        self.report(results)
+        self.stdout.write(f"Results saved to {options['output']}")
+
+        if options["compare"]:
+            with open(options["compare"]) as file:
+                regressions = compare(
+                    results, json.load(file), options["max_regression"]
+                )
+            if regressions:
+                raise CommandError(
+                    "Regressions since "
+                    f"{options['compare']}:\n" + "\n".join(regressions)
+                )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"No regressions since {options['compare']}"
+                )
+            )
+
+    @staticmethod
+    def get_context():
+        """Objects the workloads pick their requests from"""
+        target = (
+            ShowSession.objects.filter(show_time__gte=timezone.now())
+            .annotate(
+                available=F("planetarium_dome__rows")
+                * F("planetarium_dome__seats_in_row")
+                - F("tickets_sold")
+            )
+            .order_by("-available", "show_time")
+            .values(
+                "id",
+                rows=F("planetarium_dome__rows"),
+                seats_in_row=F("planetarium_dome__seats_in_row"),
+            )
+            .first()
+        )
+        return {
+            "themes": list(
+                ShowTheme.objects.values_list("id", flat=True)[:100]
+            ),
+            "shows": list(
+                AstronomyShow.objects.values_list("id", flat=True)[:100]
+            ),
+            "domes": list(
+                PlanetariumDome.objects.values_list("id", flat=True)[:100]
+            ),
+            "sessions": list(
+                ShowSession.objects.filter(show_time__gte=timezone.now())
+                .order_by("show_time")
+                .values_list("id", flat=True)[:100]
+            ),
+            "target": target,
+        }
+
+    def run(self, base_url, users, context, rnd, options):
+        clients = []
+        for user in users:
+            client = Client(base_url)
+            client.email = user.email
+            client.login(user.email, PASSWORD)
+            clients.append(client)
+
+        results = {
+            "started_at": timezone.now().isoformat(),
+            "commit": self.git_commit(),
+            "url": options["url"],
+            "concurrency": options["concurrency"],
+            "duration": options["duration"],
+            "iterations": options["iterations"],
+            "workloads": {},
+        }
+        try:
+            for name in options["workload"] or WORKLOADS:
+                self.stdout.write(f"Running {name}...")
+                results["workloads"][name] = run_workload(
+                    WORKLOADS[name],
+                    context,
+                    clients,
+                    rnd,
+                    duration=options["duration"],
+                    iterations=options["iterations"],
+                )
+        finally:
+            for client in clients:
+                client.close()
+        return results
+
+    @staticmethod
+    def git_commit():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def report(self, results):
+        for name, workload in results["workloads"].items():
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(
+                    f"{name}: {workload['requests']} requests in "
+                    f"{workload['elapsed']}s, {workload['throughput']} req/s"
+                )
+            )
+            self.stdout.write(
+                f"  {'route':<45} {'reqs':>6} {'p50':>8} {'p95':>8} "
+                f"{'p99':>8} {'req/s':>8} {'sql':>6} {'err':>5}"
+            )
+            for label, endpoint in workload["endpoints"].items():
+                queries = endpoint["queries"]
+                self.stdout.write(
+                    f"  {label[:45]:<45} {endpoint['requests']:>6} "
+                    f"{endpoint['p50_ms']:>8} {endpoint['p95_ms']:>8} "
+                    f"{endpoint['p99_ms']:>8} {endpoint['throughput']:>8} "
+                    f"{'-' if queries is None else queries:>6} "
+                    f"{endpoint['errors']:>5}"
+                )
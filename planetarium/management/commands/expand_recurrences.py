@@ -0,0 +1,41 @@
+from django.core.management import BaseCommand
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from planetarium.models import SessionRecurrence
+from planetarium.schedule import expand_recurrence
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the missing sessions of the recurrences that have not "
+        "ended yet. Safe to run again, only missing sessions are added."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "ids",
+            nargs="*",
+            type=int,
+            help="Recurrences to expand, all current ones by default",
+        )
+
+    def handle(self, *args, **options):
+        recurrences = SessionRecurrence.objects.filter(
+            ends_on__gte=timezone.localdate()
+        ).order_by("id")
+        if options["ids"]:
+            recurrences = recurrences.filter(id__in=options["ids"])
+
+        created = 0
+        for recurrence in recurrences:
+            try:
+                created += expand_recurrence(recurrence)
+            except ValidationError as error:
+                for occurrence, errors in error.detail["occurrences"].items():
+                    for message in errors:
+                        self.stderr.write(
+                            f"Recurrence {recurrence.id}, {occurrence}: "
+                            f"{message}"
+                        )
+        self.stdout.write(self.style.SUCCESS(f"Created {created} session(s)"))
@@ -0,0 +1,43 @@
+from django.core.management import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from planetarium.schedule import import_schedule, read_schedule
+
+
+class Command(BaseCommand):
+    help = (
+        "Create show sessions from a CSV file with a header row or a JSON "
+        "array, with astronomy_show, planetarium_dome and show_time. "
+        "Nothing is created if any row is invalid or overlaps a session."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON file to import")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate the sessions without creating them",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], "rb") as file:
+                count = import_schedule(
+                    read_schedule(file), dry_run=options["dry_run"]
+                )
+        except ValidationError as error:
+            if (
+                not isinstance(error.detail, dict)
+                or "rows" not in error.detail
+            ):
+                raise CommandError(error.detail)
+            for number, row_errors in error.detail["rows"].items():
+                for field, messages in row_errors.items():
+                    for message in messages:
+                        self.stderr.write(f"Row {number}, {field}: {message}")
+            raise CommandError(
+                f"Nothing was imported, {len(error.detail['rows'])} "
+                f"invalid row(s)"
+            )
+        verb = "Validated" if options["dry_run"] else "Imported"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {count} session(s)"))
@@ -0,0 +1,13 @@
+from django.core.management import BaseCommand
+
+from planetarium.models import ShowSession
+
+
+class Command(BaseCommand):
+    help = "Recount the sold tickets counter of every show session"
+
+    def handle(self, *args, **options):
+        fixed = ShowSession.reconcile_tickets_sold()
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled {fixed} show session(s)")
+        )
@@ -0,0 +1,35 @@
+import datetime
+
+from django.core.management import BaseCommand
+
+from planetarium.models import SessionOccupancy
+
+
+class Command(BaseCommand):
+    help = (
+        "Bring the occupancy rollups read by the analytics endpoints up "
+        "to date with the sessions changed since the last refresh. Run "
+        "it every few minutes; reports are as fresh as its last run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Refresh every session instead of the changed ones",
+        )
+        parser.add_argument(
+            "--overlap",
+            type=int,
+            default=300,
+            help="Seconds before the watermark to look for changes from",
+        )
+
+    def handle(self, *args, **options):
+        refreshed = SessionOccupancy.refresh(
+            overlap=datetime.timedelta(seconds=options["overlap"]),
+            full=options["full"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Refreshed {refreshed} session rollup(s)")
+        )
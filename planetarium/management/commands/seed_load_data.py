@@ -0,0 +1,241 @@
+import datetime
+import random
+import time
+import uuid
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from planetarium.catalog_cache import bump_versions
+from planetarium.models import (
+    ShowTheme,
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Reservation,
+    Ticket,
+)
+
+WORDS = (
+    "star",
+    "planet",
+    "galaxy",
+    "nebula",
+    "comet",
+    "moon",
+    "orbit",
+    "telescope",
+    "black",
+    "hole",
+    "light",
+    "universe",
+)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a production-scale dataset: domes, themes, shows, "
+        "a schedule of sessions and users with reservations and tickets"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--domes", type=int, default=20)
+        parser.add_argument("--themes", type=int, default=50)
+        parser.add_argument("--shows", type=int, default=200)
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Length of the schedule, starting today",
+        )
+        parser.add_argument("--sessions-per-day", type=int, default=20)
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument("--reservations", type=int, default=1_000_000)
+        parser.add_argument(
+            "--max-tickets-per-reservation", type=int, default=6
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=None)
+
+    def bulk_create(self, model, objects, batch_size):
+        """Insert objects in batches, return the saved instances"""
+        started = time.monotonic()
+        created = []
+        for batch in batched(objects, batch_size):
+            created.extend(model.objects.bulk_create(batch))
+        self.stdout.write(
+            f"{model.__name__}: {len(created)} rows "
+            f"in {time.monotonic() - started:.1f}s"
+        )
+        return created
+
+    def handle(self, *args, **options):
+        rnd = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+        token = uuid.uuid4().hex[:8]
+
+        domes = self.bulk_create(
+            PlanetariumDome,
+            (
+                PlanetariumDome(
+                    name=f"Dome {token}-{i}",
+                    rows=rnd.randint(10, 30),
+                    seats_in_row=rnd.randint(15, 40),
+                )
+                for i in range(options["domes"])
+            ),
+            batch_size,
+        )
+        themes = self.bulk_create(
+            ShowTheme,
+            (
+                ShowTheme(name=f"Theme {token}-{i}")
+                for i in range(options["themes"])
+            ),
+            batch_size,
+        )
+        shows = self.bulk_create(
+            AstronomyShow,
+            (
+                AstronomyShow(
+                    title=f"Show {token}-{i}",
+                    description=" ".join(rnd.choices(WORDS, k=30)),
+                )
+                for i in range(options["shows"])
+            ),
+            batch_size,
+        )
+        self.bulk_create(
+            AstronomyShow.themes.through,
+            (
+                AstronomyShow.themes.through(
+                    astronomyshow_id=show.id, showtheme_id=theme.id
+                )
+                for show in shows
+                for theme in rnd.sample(themes, min(3, len(themes)))
+            ),
+            batch_size,
+        )
+        AstronomyShow.update_search_vector(*(show.id for show in shows))
+
+        sessions = self.bulk_create(
+            ShowSession,
+            self.schedule(rnd, shows, domes, options),
+            batch_size,
+        )
+
+        password = make_password("load-test-password")
+        users = self.bulk_create(
+            get_user_model(),
+            (
+                get_user_model()(
+                    email=f"user{i}.{token}@load.test", password=password
+                )
+                for i in range(options["users"])
+            ),
+            batch_size,
+        )
+
+        self.create_bookings(rnd, sessions, users, options)
+
+        ShowSession.reconcile_tickets_sold()
+        bump_versions(ShowTheme, AstronomyShow, PlanetariumDome)
+        self.stdout.write(self.style.SUCCESS("Load data generated!"))
+
+    @staticmethod
+    def schedule(rnd, shows, domes, options):
+        """
+        Sessions of random shows from 10:00 each day, the domes taking
+        turns so that the sessions of a dome start an hour apart
+        """
+        today = timezone.now().replace(
+            hour=10, minute=0, second=0, microsecond=0
+        )
+        interval = datetime.timedelta(hours=1) / len(domes)
+        for day in range(options["days"]):
+            for slot in range(options["sessions_per_day"]):
+                show = rnd.choice(shows)
+                show_time = (
+                    today + datetime.timedelta(days=day) + slot * interval
+                )
+                yield ShowSession(
+                    astronomy_show=show,
+                    planetarium_dome=domes[slot % len(domes)],
+                    show_time=show_time,
+                    end_time=show_time + show.duration,
+                )
+
+    def create_bookings(self, rnd, sessions, users, options):
+        """
+        Book reservations of 1..N adjacent seats in random sessions,
+        filling each session row by row
+        """
+        if not sessions or not users:
+            return
+        capacity = {
+            session.id: session.planetarium_dome.capacity
+            for session in sessions
+        }
+        seats_in_row = {
+            session.id: session.planetarium_dome.seats_in_row
+            for session in sessions
+        }
+        booked = dict.fromkeys(capacity, 0)
+        open_sessions = list(capacity)
+        max_tickets = options["max_tickets_per_reservation"]
+        started = time.monotonic()
+        reservations_count = tickets_count = 0
+
+        remaining = options["reservations"]
+        while remaining > 0 and open_sessions:
+            size = min(remaining, options["batch_size"])
+            remaining -= size
+            reservations = Reservation.objects.bulk_create(
+                Reservation(user=rnd.choice(users)) for _ in range(size)
+            )
+            tickets = []
+            for reservation in reservations:
+                if not open_sessions:
+                    break
+                index = rnd.randrange(len(open_sessions))
+                session_id = open_sessions[index]
+                count = min(
+                    rnd.randint(1, max_tickets),
+                    capacity[session_id] - booked[session_id],
+                )
+                for position in range(
+                    booked[session_id], booked[session_id] + count
+                ):
+                    row, seat = divmod(position, seats_in_row[session_id])
+                    tickets.append(
+                        Ticket(
+                            show_session_id=session_id,
+                            reservation=reservation,
+                            row=row + 1,
+                            seat=seat + 1,
+                        )
+                    )
+                booked[session_id] += count
+                if booked[session_id] == capacity[session_id]:
+                    open_sessions[index] = open_sessions[-1]
+                    open_sessions.pop()
+            Ticket.objects.bulk_create(
+                tickets, batch_size=options["batch_size"]
+            )
+            reservations_count += len(reservations)
+            tickets_count += len(tickets)
+
+        self.stdout.write(
+            f"Reservation: {reservations_count} rows, "
+            f"Ticket: {tickets_count} rows "
+            f"in {time.monotonic() - started:.1f}s"
+        )
@@ -0,0 +1,352 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseForbidden
+from rest_framework import renderers
+
+from planetarium_service.db.pool import pool_stats
+
+DURATION_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+POOL_METRICS = (
+    ("size", "gauge", "Open connections"),
+    ("max_size", "gauge", "Maximum open connections"),
+    ("idle", "gauge", "Idle connections"),
+    ("in_use", "gauge", "Connections in use"),
+    ("waiting", "gauge", "Threads waiting for a connection"),
+    ("checkouts", "counter", "Connections handed out"),
+    ("timeouts", "counter", "Checkouts that gave up waiting"),
+    ("wait_seconds", "counter", "Time spent waiting for connections"),
+)
+
+current_timings = ContextVar("current_timings", default=None)
+
+
+def escape(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def format_labels(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{key}="{escape(value)}"' for key, value in pairs)
+        + "}"
+    )
+
+
+class Histogram:
+    """Prometheus histogram with one series per label set"""
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * len(self.buckets), 0, 0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def expose(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for labels, (buckets, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, observed in zip(self.buckets, buckets):
+                cumulative += observed
+                lines.append(
+                    f"{self.name}_bucket{format_labels(labels, le=bound)} "
+                    f"{cumulative}"
+                )
+            lines.append(
+                f"{self.name}_bucket{format_labels(labels, le='+Inf')} "
+                f"{count}"
+            )
+            lines.append(f"{self.name}_sum{format_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {count}")
+        return lines
+
+
+class Counter:
+    """Prometheus counter with one series per label set"""
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self.series = {}
+
+    def inc(self, labels):
+        self.series[labels] = self.series.get(labels, 0) + 1
+
+    def expose(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        for labels, value in sorted(self.series.items()):
+            lines.append(f"{self.name}{format_labels(labels)} {value}")
+        return lines
+
+
+class Registry:
+    """
+    Request metrics of this process. Every worker keeps its own, and a
+    scrape of /metrics is answered by whichever worker accepts it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = Counter(
+            "planetarium_requests_total", "Requests by view and status"
+        )
+        self.duration = Histogram(
+            "planetarium_request_duration_seconds",
+            "Time spent answering the request",
+            DURATION_BUCKETS,
+        )
+        self.sql_duration = Histogram(
+            "planetarium_request_sql_duration_seconds",
+            "Time spent in SQL queries per request",
+            DURATION_BUCKETS,
+        )
+        self.serializer_duration = Histogram(
+            "planetarium_request_serializer_duration_seconds",
+            "Time spent rendering response data per request",
+            DURATION_BUCKETS,
+        )
+        self.queries = Histogram(
+            "planetarium_request_queries",
+            "SQL queries per request",
+            QUERY_BUCKETS,
+        )
+
+    def observe(self, timings, status):
+        labels = (
+            ("view", timings.view),
+            ("action", timings.action),
+            ("method", timings.method),
+        )
+        with self.lock:
+            self.requests.inc((*labels, ("status", str(status))))
+            self.duration.observe(labels, timings.total)
+            self.sql_duration.observe(labels, timings.sql)
+            self.serializer_duration.observe(labels, timings.serializer)
+            self.queries.observe(labels, timings.queries)
+
+    def expose(self):
+        with self.lock:
+            lines = [
+                line
+                for metric in (
+                    self.requests,
+                    self.duration,
+                    self.sql_duration,
+                    self.serializer_duration,
+                    self.queries,
+                )
+                for line in metric.expose()
+            ]
+        lines.extend(expose_pools())
+        return "\n".join(lines) + "\n"
+
+
+def expose_pools():
+    """Usage of the database connection pools of this process"""
+    stats = pool_stats()
+    if not stats:
+        return []
+    lines = []
+    for key, kind, documentation in POOL_METRICS:
+        name = f"planetarium_db_pool_{key}"
+        if kind == "counter":
+            name += "_total"
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (alias, database), values in sorted(stats.items()):
+            labels = (("alias", alias), ("database", database))
+            lines.append(f"{name}{format_labels(labels)} {values[key]}")
+    return lines
+
+
+registry = Registry()
+
+
+class RequestTimings:
+    def __init__(self, method):
+        self.method = method
+        self.view = "unresolved"
+        self.action = ""
+        self.queries = 0
+        self.sql = 0.0
+        self.serializer = 0.0
+        self.serializing = False
+        self.total = 0.0
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += time.perf_counter() - started
+            self.queries += 1
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.sql * 1000:.2f};desc="{self.queries} queries", '
+            f"serialize;dur={self.serializer * 1000:.2f}, "
+            f"total;dur={self.total * 1000:.2f}"
+        )
+
+
+def view_labels(view_func):
+    """Return the (view, action) a resolved view function stands for"""
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        view_class = getattr(view_func, "view_class", None)
+    name = (
+        view_class.__name__
+        if view_class is not None
+        else getattr(view_func, "__name__", type(view_func).__name__)
+    )
+    return name, getattr(view_func, "actions", None) or {}
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper counting queries towards the request"""
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings.record_query(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def time_queries(sender, connection, **kwargs):
+    # the context variable follows the request into sync_to_async threads
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class MetricsMiddleware:
+    """
+    Time every request with its SQL queries and the rendering of its
+    data, report them in a Server-Timing header and in the process-wide
+    histograms exposed by metrics_view
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings(request.method)
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(response, timings, started)
+
+    async def __acall__(self, request):
+        timings = RequestTimings(request.method)
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(response, timings, started)
+
+    def finish(self, response, timings, started):
+        timings.total = time.perf_counter() - started
+        registry.observe(timings, response.status_code)
+        if settings.SERVER_TIMING:
+            response.headers["Server-Timing"] = timings.server_timing()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = current_timings.get()
+        if timings is not None:
+            timings.view, actions = view_labels(view_func)
+            timings.action = actions.get(request.method.lower(), "")
+
+
+class TimedRendererMixin:
+    """Count the time spent rendering response data towards the request"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        timings = current_timings.get()
+        if timings is None or timings.serializing:
+            return super().render(data, accepted_media_type, renderer_context)
+        # the browsable API renders the data with the JSON renderer
+        timings.serializing = True
+        started = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            timings.serializer += time.perf_counter() - started
+            timings.serializing = False
+
+
+class JSONRenderer(TimedRendererMixin, renderers.JSONRenderer):
+    pass
+
+
+class BrowsableAPIRenderer(TimedRendererMixin, renderers.BrowsableAPIRenderer):
+    pass
+
+
+def metrics_view(request):
+    """
+    Request metrics of this process in the Prometheus text format. With
+    several workers behind one address each scrape sees one of them, so
+    the metrics only add up with one worker per scraped address.
+    """
+    if request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.expose(), content_type="text/plain; version=0.0.4"
+    )
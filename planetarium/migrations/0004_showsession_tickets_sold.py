@@ -0,0 +1,47 @@
+# Generated by Django 4.2.6 on 2026-10-17 19:52
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def count_tickets_sold(apps, schema_editor):
+    ShowSession = apps.get_model("planetarium", "ShowSession")
+    Ticket = apps.get_model("planetarium", "Ticket")
+    sold = (
+        Ticket.objects.filter(show_session=OuterRef("pk"))
+        .order_by()
+        .values("show_session")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    ShowSession.objects.update(tickets_sold=Coalesce(Subquery(sold), 0))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "planetarium",
+            "0003_alter_ticket_options_alter_ticket_unique_together",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="showsession",
+            name="tickets_sold",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="ticket",
+            name="reservation",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="tickets",
+                to="planetarium.reservation",
+            ),
+        ),
+        migrations.RunPython(count_tickets_sold, migrations.RunPython.noop),
+    ]
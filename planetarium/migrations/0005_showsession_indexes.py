@@ -0,0 +1,25 @@
+# Generated by Django 4.2.6 on 2026-10-17 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("planetarium", "0004_showsession_tickets_sold"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="showsession",
+            index=models.Index(
+                fields=["show_time", "id"], name="showsession_time_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="showsession",
+            index=models.Index(
+                fields=["planetarium_dome", "show_time"],
+                name="showsession_dome_time_idx",
+            ),
+        ),
+    ]
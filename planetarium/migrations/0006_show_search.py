@@ -0,0 +1,52 @@
+# Generated by Django 4.2.6 on 2026-10-17 19:57
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+import django.db.models.functions.text
+
+
+def fill_search_vector(apps, schema_editor):
+    AstronomyShow = apps.get_model("planetarium", "AstronomyShow")
+    AstronomyShow.objects.update(
+        search_vector=(
+            SearchVector("title", weight="A", config="english")
+            + SearchVector("description", weight="B", config="english")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("planetarium", "0005_showsession_indexes"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="astronomyshow",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(fill_search_vector, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="astronomyshow",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="astronomyshow_search_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="showtheme",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"),
+                    name="gin_trgm_ops",
+                ),
+                name="showtheme_name_trgm_idx",
+            ),
+        ),
+    ]
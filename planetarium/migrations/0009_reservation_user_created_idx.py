@@ -0,0 +1,19 @@
+# Generated by Django 4.2.6 on 2026-10-17 20:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("planetarium", "0008_seathold"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="reservation_user_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.6 on 2026-10-17 20:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("planetarium", "0009_reservation_user_created_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SessionOccupancy",
+            fields=[
+                (
+                    "show_session",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="occupancy",
+                        serialize=False,
+                        to="planetarium.showsession",
+                    ),
+                ),
+                ("show_time", models.DateTimeField()),
+                ("seats", models.IntegerField()),
+                ("tickets_sold", models.IntegerField()),
+                ("source_updated_at", models.DateTimeField()),
+                (
+                    "astronomy_show",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="planetarium.astronomyshow",
+                    ),
+                ),
+                (
+                    "planetarium_dome",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="planetarium.planetariumdome",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["show_time"], name="occupancy_show_time_idx"
+                    ),
+                    models.Index(
+                        fields=["source_updated_at"],
+                        name="occupancy_source_updated_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.6 on 2026-10-17 20:55
+
+import datetime
+import django.contrib.postgres.constraints
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+from django.db.models import F
+import planetarium.models
+
+
+def fill_end_time(apps, schema_editor):
+    # every show has the default duration so far
+    ShowSession = apps.get_model("planetarium", "ShowSession")
+    ShowSession.objects.filter(show_time__isnull=False).update(
+        end_time=F("show_time") + datetime.timedelta(hours=1)
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("planetarium", "0010_sessionoccupancy"),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddField(
+            model_name="astronomyshow",
+            name="duration",
+            field=models.DurationField(
+                default=datetime.timedelta(seconds=3600)
+            ),
+        ),
+        migrations.AddField(
+            model_name="showsession",
+            name="end_time",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_end_time, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="showsession",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                condition=models.Q(("show_time__isnull", False)),
+                expressions=[
+                    ("planetarium_dome", "="),
+                    (
+                        planetarium.models.TsTzRange("show_time", "end_time"),
+                        "&&",
+                    ),
+                ],
+                name="showsession_dome_no_overlap",
+            ),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 4.2.6 on 2026-10-17 20:59
+
+import django.contrib.postgres.fields
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("planetarium", "0011_session_end_time_no_overlap"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SessionRecurrence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "weekdays",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.PositiveSmallIntegerField(
+                            validators=[
+                                django.core.validators.MaxValueValidator(6)
+                            ]
+                        ),
+                        size=None,
+                    ),
+                ),
+                ("start_time", models.TimeField()),
+                ("starts_on", models.DateField()),
+                ("ends_on", models.DateField(db_index=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="sessionrecurrence",
+            name="astronomy_show",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="recurrences",
+                to="planetarium.astronomyshow",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sessionrecurrence",
+            name="planetarium_dome",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="recurrences",
+                to="planetarium.planetariumdome",
+            ),
+        ),
+        migrations.AddField(
+            model_name="showsession",
+            name="recurrence",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="sessions",
+                to="planetarium.sessionrecurrence",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="showsession",
+            constraint=models.UniqueConstraint(
+                fields=("recurrence", "show_time"),
+                name="showsession_recurrence_time_uniq",
+            ),
+        ),
+    ]
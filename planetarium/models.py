@@ -1,38 +1,223 @@
-from django.db import models
+import datetime
+from collections import namedtuple
+from contextlib import contextmanager
+from itertools import islice
+
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import (
+    ArrayField,
+    DateTimeRangeField,
+    RangeOperators,
+)
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.core.cache import caches
+from django.core.validators import MaxValueValidator
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Q, Count, Func, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest, Now, Upper
+from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 
+from planetarium.exceptions import SessionsOverlap
 from user.models import User
 
+SESSION_OVERLAP_CONSTRAINT = "showsession_dome_no_overlap"
+DOME_SHAPE_CACHE = "dome_shape"
+DOME_SHAPE_CACHE_TIMEOUT = 60 * 60
+
+
+def seat_lookup(seats):
+    """Match any of the (row, seat) pairs"""
+    return Q(*(Q(row=row, seat=seat) for row, seat in seats), _connector=Q.OR)
+
+
+@contextmanager
+def raise_overlaps(using=None):
+    """
+    Run the block in a savepoint and raise SessionsOverlap if it breaks
+    the constraint against overlapping sessions of a dome
+    """
+    try:
+        with transaction.atomic(using=using):
+            yield
+    except IntegrityError as error:
+        diag = getattr(error.__cause__, "diag", None)
+        if (
+            getattr(diag, "constraint_name", None)
+            == SESSION_OVERLAP_CONSTRAINT
+        ):
+            raise SessionsOverlap() from error
+        raise
+
+
+class TsTzRange(Func):
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
 
 class ShowTheme(models.Model):
     name = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
 
+    class Meta:
+        indexes = [
+            # Serves name__icontains, which compares UPPER(name)
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="showtheme_name_trgm_idx",
+            ),
+        ]
+
 
 class AstronomyShow(models.Model):
+    SEARCH_CONFIG = "english"
+
     title = models.CharField(max_length=255)
     description = models.TextField()
     themes = models.ManyToManyField(ShowTheme, related_name="shows")
+    duration = models.DurationField(default=datetime.timedelta(hours=1))
+    search_vector = SearchVectorField(null=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @staticmethod
+    def update_search_vector(*astronomy_show_ids):
+        AstronomyShow.objects.filter(id__in=astronomy_show_ids).update(
+            search_vector=(
+                SearchVector(
+                    "title", weight="A", config=AstronomyShow.SEARCH_CONFIG
+                )
+                + SearchVector(
+                    "description",
+                    weight="B",
+                    config=AstronomyShow.SEARCH_CONFIG,
+                )
+            )
+        )
+
+    def save(
+        self,
+        force_insert=False,
+        force_update=False,
+        using=None,
+        update_fields=None,
+    ):
+        adding = self._state.adding
+        with transaction.atomic(using=using):
+            super(AstronomyShow, self).save(
+                force_insert, force_update, using, update_fields
+            )
+            if not adding and (
+                update_fields is None or "duration" in update_fields
+            ):
+                # the sessions take the new duration, or nothing is saved
+                ShowSession.reschedule(self.id, self.duration)
 
     def __str__(self):
         return self.title
 
+    class Meta:
+        indexes = [
+            GinIndex(
+                fields=["search_vector"], name="astronomyshow_search_idx"
+            ),
+        ]
+
+
+DomeShape = namedtuple("DomeShape", ("rows", "seats_in_row"))
+
 
 class PlanetariumDome(models.Model):
     name = models.CharField(max_length=255)
     rows = models.IntegerField()
     seats_in_row = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     @property
     def capacity(self):
         return self.rows * self.seats_in_row
 
+    @staticmethod
+    def shape_cache_key(show_session_id):
+        return f"planetarium:dome-shape:{show_session_id}"
+
+    @staticmethod
+    def get_shape(show_session_id):
+        """Return the cached rows and seats_in_row of a session's dome"""
+        key = PlanetariumDome.shape_cache_key(show_session_id)
+        shape = caches[DOME_SHAPE_CACHE].get(key)
+        if shape is None:
+            shapes = PlanetariumDome.objects.filter(
+                domes=show_session_id
+            ).values_list("rows", "seats_in_row")
+            if not shapes:
+                return None
+            shape = DomeShape(*shapes[0])
+            caches[DOME_SHAPE_CACHE].set(key, shape, DOME_SHAPE_CACHE_TIMEOUT)
+        return shape
+
+    @staticmethod
+    def invalidate_shapes(*show_session_ids):
+        """
+        Drop the shapes now and once more on commit, so no shape read
+        before the commit outlives it
+        """
+        keys = [
+            PlanetariumDome.shape_cache_key(show_session_id)
+            for show_session_id in show_session_ids
+        ]
+        if keys:
+            caches[DOME_SHAPE_CACHE].delete_many(keys)
+            transaction.on_commit(
+                lambda: caches[DOME_SHAPE_CACHE].delete_many(keys)
+            )
+
     def __str__(self):
         return self.name
 
 
+class SessionRecurrence(models.Model):
+    """
+    Sessions of a show in a dome on some weekdays at a time of day, in
+    TIME_ZONE, from starts_on to ends_on, created by expanding it (see
+    planetarium.schedule.expand_recurrence)
+    """
+
+    astronomy_show = models.ForeignKey(
+        AstronomyShow, on_delete=models.CASCADE, related_name="recurrences"
+    )
+    planetarium_dome = models.ForeignKey(
+        PlanetariumDome, on_delete=models.CASCADE, related_name="recurrences"
+    )
+    # 0 is Monday, as in date.weekday()
+    weekdays = ArrayField(
+        models.PositiveSmallIntegerField(validators=[MaxValueValidator(6)])
+    )
+    start_time = models.TimeField()
+    starts_on = models.DateField()
+    ends_on = models.DateField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def occurrences(self, since):
+        """Start times of the sessions from since until ends_on"""
+        day = max(self.starts_on, since)
+        while day <= self.ends_on:
+            if day.weekday() in self.weekdays:
+                yield timezone.make_aware(
+                    datetime.datetime.combine(day, self.start_time)
+                )
+            day += datetime.timedelta(days=1)
+
+    def __str__(self):
+        return (
+            f"{self.astronomy_show} in {self.planetarium_dome} "
+            f"from {self.starts_on} to {self.ends_on}"
+        )
+
+
 class ShowSession(models.Model):
     astronomy_show = models.ForeignKey(
         to=AstronomyShow,
@@ -46,7 +231,78 @@ class ShowSession(models.Model):
         on_delete=models.CASCADE,
         null=False,
     )
+    recurrence = models.ForeignKey(
+        SessionRecurrence,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="sessions",
+    )
     show_time = models.DateTimeField(null=True)
+    # show_time plus the duration of the show, kept by save() and
+    # reschedule() for the overlap constraint
+    end_time = models.DateTimeField(null=True, editable=False)
+    tickets_sold = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @staticmethod
+    def add_tickets_sold(show_session_id, count):
+        """
+        Count the tickets once the transaction commits, so buyers of a
+        session do not hold its row lock until their commit and wait on
+        each other. Counts lost to a crash in between are recounted by
+        reconcile_tickets_sold.
+        """
+        transaction.on_commit(
+            lambda: ShowSession.objects.filter(id=show_session_id).update(
+                tickets_sold=F("tickets_sold") + count, updated_at=Now()
+            )
+        )
+
+    @staticmethod
+    def reconcile_tickets_sold():
+        """Recount tickets of drifted sessions, return how many were fixed"""
+        sold = Coalesce(
+            Subquery(
+                Ticket.objects.filter(show_session=OuterRef("pk"))
+                .order_by()
+                .values("show_session")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+        return ShowSession.objects.exclude(tickets_sold=sold).update(
+            tickets_sold=sold, updated_at=Now()
+        )
+
+    @staticmethod
+    def reschedule(astronomy_show_id, duration):
+        """Set the end time of the show's sessions from its duration"""
+        end_time = F("show_time") + duration
+        with raise_overlaps():
+            ShowSession.objects.filter(
+                astronomy_show_id=astronomy_show_id, show_time__isnull=False
+            ).exclude(end_time=end_time).update(end_time=end_time)
+
+    def save(
+        self,
+        force_insert=False,
+        force_update=False,
+        using=None,
+        update_fields=None,
+    ):
+        self.end_time = (
+            self.show_time + self.astronomy_show.duration
+            if self.show_time is not None
+            else None
+        )
+        if update_fields is not None and "show_time" in update_fields:
+            update_fields = {*update_fields, "end_time"}
+        with raise_overlaps(using=using):
+            return super(ShowSession, self).save(
+                force_insert, force_update, using, update_fields
+            )
 
     def __str__(self):
         return (
@@ -54,6 +310,35 @@ class ShowSession(models.Model):
             f" at {self.show_time.strftime('%Y-%m-%d %H:%M:%S')}"
         )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["show_time", "id"], name="showsession_time_id_idx"
+            ),
+            models.Index(
+                fields=["planetarium_dome", "show_time"],
+                name="showsession_dome_time_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recurrence", "show_time"],
+                name="showsession_recurrence_time_uniq",
+            ),
+            # sessions of a dome may not overlap, back to back is fine
+            ExclusionConstraint(
+                name=SESSION_OVERLAP_CONSTRAINT,
+                expressions=[
+                    ("planetarium_dome", RangeOperators.EQUAL),
+                    (
+                        TsTzRange("show_time", "end_time"),
+                        RangeOperators.OVERLAPS,
+                    ),
+                ],
+                condition=Q(show_time__isnull=False),
+            ),
+        ]
+
 
 class Reservation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -64,6 +349,14 @@ class Reservation(models.Model):
     def __str__(self):
         return self.created_at.strftime("%Y-%m-%d")
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="reservation_user_created_idx",
+            ),
+        ]
+
 
 class Ticket(models.Model):
     row = models.IntegerField()
@@ -76,7 +369,7 @@ class Ticket(models.Model):
     )
     reservation = models.ForeignKey(
         Reservation,
-        on_delete=models.SET_NULL,
+        on_delete=models.CASCADE,
         null=True,
         related_name="tickets",
     )
@@ -116,10 +409,18 @@ class Ticket(models.Model):
         using=None,
         update_fields=None,
     ):
-        self.full_clean()
-        return super(Ticket, self).save(
-            force_insert, force_update, using, update_fields
-        )
+        if self.show_session_id is not None:
+            shape = PlanetariumDome.get_shape(self.show_session_id)
+            if shape is None:
+                raise ValidationError(
+                    {"show_session": "Show session does not exist."}
+                )
+            # uniqueness is left to the database constraint
+            Ticket.validate_ticket(self.row, self.seat, shape)
+        with transaction.atomic(using=using):
+            return super(Ticket, self).save(
+                force_insert, force_update, using, update_fields
+            )
 
     def __str__(self):
         return f"{str(self.show_session)} (row: {self.row}, seat: {self.seat})"
@@ -127,3 +428,145 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ("show_session", "row", "seat")
         ordering = ["row", "seat"]
+
+
+class SeatHold(models.Model):
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    show_session = models.ForeignKey(
+        ShowSession,
+        on_delete=models.CASCADE,
+        related_name="holds",
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="seat_holds"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return (
+            f"{self.show_session_id} (row: {self.row}, seat: {self.seat}) "
+            f"until {self.expires_at.strftime('%Y-%m-%d %H:%M:%S')}"
+        )
+
+    class Meta:
+        unique_together = ("show_session", "row", "seat")
+        ordering = ["expires_at", "row", "seat"]
+
+
+class SessionOccupancy(models.Model):
+    """
+    Seats and sold tickets of a scheduled session, kept apart from the
+    booking tables for the analytics reports and brought up to date by
+    SessionOccupancy.refresh()
+    """
+
+    show_session = models.OneToOneField(
+        ShowSession,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="occupancy",
+    )
+    astronomy_show = models.ForeignKey(
+        AstronomyShow, on_delete=models.CASCADE, related_name="+"
+    )
+    planetarium_dome = models.ForeignKey(
+        PlanetariumDome, on_delete=models.CASCADE, related_name="+"
+    )
+    show_time = models.DateTimeField()
+    seats = models.IntegerField()
+    tickets_sold = models.IntegerField()
+    # last change of the session or its dome, the refresh watermark
+    source_updated_at = models.DateTimeField()
+
+    REFRESH_BATCH_SIZE = 1000
+
+    @staticmethod
+    def refresh(overlap=datetime.timedelta(minutes=5), full=False):
+        """
+        Upsert the rollups of the sessions changed since the last refresh
+        and return how many. Changes are looked for from the latest one
+        already seen minus overlap, which covers transactions committed
+        after later ones; upserting a session again is harmless.
+        """
+        sessions = ShowSession.objects.all()
+        watermark = SessionOccupancy.objects.aggregate(
+            Max("source_updated_at")
+        )["source_updated_at__max"]
+        if not full and watermark is not None:
+            since = watermark - overlap
+            sessions = sessions.filter(
+                Q(updated_at__gt=since)
+                | Q(planetarium_dome__updated_at__gt=since)
+            )
+        # unscheduled sessions are not reported
+        SessionOccupancy.objects.filter(
+            show_session__in=sessions.filter(show_time__isnull=True)
+        ).delete()
+
+        rows = (
+            sessions.filter(show_time__isnull=False)
+            .annotate(
+                source_updated_at=Greatest(
+                    "updated_at", "planetarium_dome__updated_at"
+                )
+            )
+            .values_list(
+                "id",
+                "astronomy_show_id",
+                "planetarium_dome_id",
+                "show_time",
+                "planetarium_dome__rows",
+                "planetarium_dome__seats_in_row",
+                "tickets_sold",
+                "source_updated_at",
+            )
+            .iterator(chunk_size=SessionOccupancy.REFRESH_BATCH_SIZE)
+        )
+        refreshed = 0
+        while batch := list(islice(rows, SessionOccupancy.REFRESH_BATCH_SIZE)):
+            SessionOccupancy.objects.bulk_create(
+                [
+                    SessionOccupancy(
+                        show_session_id=show_session_id,
+                        astronomy_show_id=astronomy_show_id,
+                        planetarium_dome_id=planetarium_dome_id,
+                        show_time=show_time,
+                        seats=dome_rows * seats_in_row,
+                        tickets_sold=tickets_sold,
+                        source_updated_at=source_updated_at,
+                    )
+                    for (
+                        show_session_id,
+                        astronomy_show_id,
+                        planetarium_dome_id,
+                        show_time,
+                        dome_rows,
+                        seats_in_row,
+                        tickets_sold,
+                        source_updated_at,
+                    ) in batch
+                ],
+                update_conflicts=True,
+                unique_fields=["show_session"],
+                update_fields=[
+                    "astronomy_show",
+                    "planetarium_dome",
+                    "show_time",
+                    "seats",
+                    "tickets_sold",
+                    "source_updated_at",
+                ],
+            )
+            refreshed += len(batch)
+        return refreshed
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["show_time"], name="occupancy_show_time_idx"),
+            models.Index(
+                fields=["source_updated_at"],
+                name="occupancy_source_updated_idx",
+            ),
+        ]
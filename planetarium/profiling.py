@@ -0,0 +1,167 @@
+import cProfile
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from asgiref.sync import (
+    async_to_sync,
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+
+STACK_SAMPLE_INTERVAL = 0.005
+
+
+def frame_label(code):
+    location = "/".join(Path(code.co_filename).parts[-2:])
+    return f"{code.co_name} ({location}:{code.co_firstlineno})".replace(
+        ";", ","
+    )
+
+
+class StackSampler(threading.Thread):
+    """
+    Sample the stack of a thread below its root function every
+    STACK_SAMPLE_INTERVAL, as folded stacks for flame graphs.
+    cProfile only keeps caller-callee pairs, not whole stacks.
+    """
+
+    def __init__(self, thread_id, root):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.root = root
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(STACK_SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame.f_code))
+                if frame.f_code is self.root:
+                    self.stacks[";".join(reversed(stack))] += 1
+                    break
+                frame = frame.f_back
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def collapsed(self):
+        """Folded stacks, one "root;...;leaf samples" line per stack"""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.items()
+        )
+
+
+class ProfilingMiddleware:
+    """
+    Run cProfile on a PROFILE_SAMPLE_RATE share of requests and keep the
+    profiles of those and of any request slower than PROFILE_SLOW_MS.
+    Sampled requests also get their stacks sampled every
+    STACK_SAMPLE_INTERVAL by a thread of their own. A threshold means
+    running cProfile on every request, which roughly doubles the time
+    spent in Python, so it is meant for investigations rather than to
+    be left on. Profiles go to PROFILE_DIR as pstats, plus folded stacks
+    for sampled requests, named after the route and the user, and only
+    the latest PROFILE_KEEP of them are kept.
+
+    Under ASGI, unprofiled requests stay async. Profiled ones run the
+    rest of the chain from a thread of their own, where sync views run
+    too; async views run on the event loop and only show up as waits.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE
+        self.slow = settings.PROFILE_SLOW_MS / 1000 or None
+        if not self.sample_rate and self.slow is None:
+            raise MiddlewareNotUsed
+        self.directory = Path(settings.PROFILE_DIR)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def handle_request(self, get_response, request):
+        # the root frame of the sampled stacks
+        return get_response(request)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sampled = random.random() < self.sample_rate
+        if not sampled and self.slow is None:
+            return self.get_response(request)
+        return self.profile(self.get_response, request, sampled)
+
+    async def __acall__(self, request):
+        sampled = random.random() < self.sample_rate
+        if not sampled and self.slow is None:
+            return await self.get_response(request)
+        return await sync_to_async(self.profile)(
+            async_to_sync(self.get_response), request, sampled
+        )
+
+    def profile(self, get_response, request, sampled):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # another thread is being profiled (Python 3.12+)
+            return get_response(request)
+        sampler = None
+        if sampled:
+            sampler = StackSampler(
+                threading.get_ident(), self.handle_request.__code__
+            )
+            sampler.start()
+        started = time.perf_counter()
+        try:
+            response = self.handle_request(get_response, request)
+        finally:
+            profiler.disable()
+            if sampler is not None:
+                sampler.stop()
+        elapsed = time.perf_counter() - started
+
+        if sampled or elapsed >= self.slow:
+            self.save(profiler, sampler, request, elapsed)
+        return response
+
+    def save(self, profiler, sampler, request, elapsed):
+        match = request.resolver_match
+        route = match.view_name if match else "unresolved"
+        user = getattr(request, "user", None)
+        user_id = user.pk if user is not None and user.pk else "anonymous"
+        name = re.sub(
+            r"[^\w.-]+",
+            "_",
+            f"{timezone.now():%Y%m%dT%H%M%S%f}-{route}-{request.method}-"
+            f"user{user_id}-{elapsed * 1000:.0f}ms",
+        )
+
+        pstats.Stats(profiler).dump_stats(self.directory / f"{name}.prof")
+        if sampler is not None:
+            (self.directory / f"{name}.folded").write_text(sampler.collapsed())
+        self.rotate()
+
+    def rotate(self):
+        profiles = sorted(
+            self.directory.glob("*.prof"), key=lambda path: path.name
+        )
+        for path in profiles[: -settings.PROFILE_KEEP]:
+            path.unlink(missing_ok=True)
+            path.with_suffix(".folded").unlink(missing_ok=True)
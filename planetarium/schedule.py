@@ -0,0 +1,264 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from operator import itemgetter
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    SessionRecurrence,
+    ShowSession,
+    TsTzRange,
+    raise_overlaps,
+)
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_FIELDS = ("astronomy_show", "planetarium_dome", "show_time")
+
+
+def read_schedule(file):
+    """Rows of a JSON array or of a CSV file with a header row"""
+    content = file.read()
+    if isinstance(content, bytes):
+        try:
+            content = content.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ValidationError({"file": "The file must be UTF-8."})
+    if content.lstrip().startswith("["):
+        try:
+            return json.loads(content)
+        except ValueError as error:
+            raise ValidationError({"file": f"Invalid JSON: {error}"})
+    return list(csv.DictReader(io.StringIO(content)))
+
+
+def resolve_references(model, name_field, references):
+    """
+    Map references to objects of model loaded in one query, digits being
+    ids and anything else a name. Names of several objects map to None.
+    """
+    ids = {reference for reference in references if reference.isdigit()}
+    names = set(references) - ids
+    resolved = {}
+    for obj in model.objects.filter(
+        Q(pk__in=ids) | Q(**{f"{name_field}__in": names})
+    ):
+        if str(obj.pk) in ids:
+            resolved[str(obj.pk)] = obj
+        name = getattr(obj, name_field)
+        if name in names:
+            resolved[name] = None if name in resolved else obj
+    return resolved
+
+
+def find_overlaps(sessions):
+    """
+    Yield pairs of keys of overlapping sessions of a dome, sessions being
+    (key, dome id, show time, end time) tuples. Every session starting
+    before an earlier one ends is paired with the one ending last.
+    """
+    by_dome = defaultdict(list)
+    for key, dome_id, show_time, end_time in sessions:
+        by_dome[dome_id].append((show_time, end_time, key))
+    for periods in by_dome.values():
+        periods.sort(key=itemgetter(0))
+        last_end = last_key = None
+        for show_time, end_time, key in periods:
+            if last_end is not None and show_time < last_end:
+                yield last_key, key
+            if last_end is None or end_time > last_end:
+                last_end, last_key = end_time, key
+
+
+def clean_rows(rows, errors):
+    """
+    Yield the sessions of the valid rows with their row number, adding
+    the errors of the others to errors
+    """
+    cleaned = []
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors[number]["non_field_errors"].append(
+                f"Expected an object with {', '.join(IMPORT_FIELDS)}."
+            )
+            continue
+        values = {
+            field: str(row.get(field) or "").strip() for field in IMPORT_FIELDS
+        }
+        for field, value in values.items():
+            if not value:
+                errors[number][field].append("This field is required.")
+        cleaned.append((number, values))
+
+    shows = resolve_references(
+        AstronomyShow,
+        "title",
+        {values["astronomy_show"] for _, values in cleaned},
+    )
+    domes = resolve_references(
+        PlanetariumDome,
+        "name",
+        {values["planetarium_dome"] for _, values in cleaned},
+    )
+    for number, values in cleaned:
+        references = (
+            ("astronomy_show", shows, "show"),
+            ("planetarium_dome", domes, "dome"),
+        )
+        for field, resolved, label in references:
+            reference = values[field]
+            if not reference:
+                continue
+            if reference not in resolved:
+                errors[number][field].append(f"Unknown {label} {reference}.")
+            elif resolved[reference] is None:
+                errors[number][field].append(
+                    f"Several {label}s are named {reference}, use its id."
+                )
+
+        show_time = None
+        if values["show_time"]:
+            try:
+                show_time = parse_datetime(values["show_time"])
+            except ValueError:
+                pass
+            if show_time is None:
+                errors[number]["show_time"].append(
+                    f"{values['show_time']} is not a valid ISO datetime."
+                )
+            elif timezone.is_naive(show_time):
+                show_time = timezone.make_aware(show_time)
+
+        if number not in errors:
+            show = shows[values["astronomy_show"]]
+            yield number, ShowSession(
+                astronomy_show=show,
+                planetarium_dome=domes[values["planetarium_dome"]],
+                show_time=show_time,
+                end_time=show_time + show.duration,
+            )
+
+
+def find_conflicts(sessions, label):
+    """
+    Yield (key, error) for the new sessions, a dict of ShowSession by
+    key, overlapping another of them or a saved session of their dome,
+    label naming the new sessions in the errors
+    """
+    periods = [
+        (
+            (label, key),
+            session.planetarium_dome_id,
+            session.show_time,
+            session.end_time,
+        )
+        for key, session in sessions.items()
+    ]
+    if periods:
+        # served by the GiST index of the overlap constraint
+        periods += [
+            (("session", pk), dome_id, show_time, end_time)
+            for pk, dome_id, show_time, end_time in ShowSession.objects.alias(
+                period=TsTzRange("show_time", "end_time")
+            )
+            .filter(
+                planetarium_dome_id__in={
+                    dome_id for _, dome_id, _, _ in periods
+                },
+                show_time__isnull=False,
+                period__overlap=(
+                    min(show_time for _, _, show_time, _ in periods),
+                    max(end_time for _, _, _, end_time in periods),
+                ),
+            )
+            .values_list("id", "planetarium_dome_id", "show_time", "end_time")
+        ]
+    for pair in find_overlaps(periods):
+        for (kind, key), (other_kind, other) in (pair, pair[::-1]):
+            if kind == label:
+                yield key, f"Overlaps {other_kind} {other} in the same dome."
+
+
+def import_schedule(rows, dry_run=False):
+    """
+    Create the sessions of rows of astronomy_show, planetarium_dome and
+    show_time with bulk_create, all of them or none. Shows and domes are
+    referenced by id, or by title and name. Sessions must not overlap
+    other sessions of their dome, imported or not. Return the number of
+    sessions, or raise a ValidationError listing the errors of each row,
+    numbered from 1.
+    """
+    if not isinstance(rows, list) or not rows:
+        raise ValidationError("Expected a non-empty list of sessions.")
+
+    errors = defaultdict(lambda: defaultdict(list))
+    sessions = dict(clean_rows(rows, errors))
+    for number, error in find_conflicts(sessions, "row"):
+        errors[number]["show_time"].append(error)
+
+    if errors:
+        raise ValidationError(
+            {
+                "rows": {
+                    number: dict(errors[number]) for number in sorted(errors)
+                }
+            }
+        )
+    if not dry_run:
+        # sessions scheduled since the check fail the constraint
+        with raise_overlaps():
+            ShowSession.objects.bulk_create(
+                sessions.values(), batch_size=IMPORT_BATCH_SIZE
+            )
+    return len(sessions)
+
+
+def expand_recurrence(recurrence, since=None):
+    """
+    Create the sessions of recurrence from since, today by default,
+    that do not exist yet, in one bulk_create. Expanding again only adds
+    the occurrences missing since. Return the number of sessions
+    created, or raise a ValidationError listing the occurrences that
+    overlap other sessions of the dome, creating none.
+    """
+    with transaction.atomic():
+        # expansions of a recurrence wait for each other
+        recurrence = (
+            SessionRecurrence.objects.select_for_update()
+            .select_related("astronomy_show")
+            .get(pk=recurrence.pk)
+        )
+        scheduled = set(
+            recurrence.sessions.values_list("show_time", flat=True)
+        )
+        duration = recurrence.astronomy_show.duration
+        sessions = {
+            show_time.isoformat(): ShowSession(
+                astronomy_show_id=recurrence.astronomy_show_id,
+                planetarium_dome_id=recurrence.planetarium_dome_id,
+                recurrence=recurrence,
+                show_time=show_time,
+                end_time=show_time + duration,
+            )
+            for show_time in recurrence.occurrences(
+                since or timezone.localdate()
+            )
+            if show_time not in scheduled
+        }
+        errors = defaultdict(list)
+        for occurrence, error in find_conflicts(sessions, "occurrence"):
+            errors[occurrence].append(error)
+        if errors:
+            raise ValidationError({"occurrences": dict(errors)})
+        with raise_overlaps():
+            ShowSession.objects.bulk_create(
+                sessions.values(), batch_size=IMPORT_BATCH_SIZE
+            )
+    return len(sessions)
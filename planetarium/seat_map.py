@@ -0,0 +1,98 @@
+import base64
+
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+SEAT_MAP_CACHE = "seat_map"
+SEAT_MAP_CACHE_TIMEOUT = 60 * 60
+
+
+def seat_map_cache_key(show_session_id):
+    return f"planetarium:seat-map:{show_session_id}"
+
+
+def build_bitmap(rows, seats_in_row, occupied):
+    """Pack occupied (row, seat) pairs into a row-major, MSB-first bitmap"""
+    bitmap = bytearray((rows * seats_in_row + 7) // 8)
+    for row, seat in occupied:
+        if not (1 <= row <= rows and 1 <= seat <= seats_in_row):
+            continue
+        index = (row - 1) * seats_in_row + (seat - 1)
+        bitmap[index // 8] |= 0x80 >> (index % 8)
+    return bytes(bitmap)
+
+
+def unpack_bitmap(bitmap, rows, seats_in_row):
+    """Return the list of occupied [row, seat] pairs stored in a bitmap"""
+    return [
+        [index // seats_in_row + 1, index % seats_in_row + 1]
+        for index in range(rows * seats_in_row)
+        if bitmap[index // 8] & (0x80 >> (index % 8))
+    ]
+
+
+def get_seat_map_cache():
+    return caches[SEAT_MAP_CACHE]
+
+
+def get_cached_seat_map(show_session_id):
+    return get_seat_map_cache().get(seat_map_cache_key(show_session_id))
+
+
+def cache_seat_map(show_session):
+    """
+    Compute the seat map of a session with a single query to the primary,
+    which has every booked ticket, and cache it
+    """
+    dome = show_session.planetarium_dome
+    occupied = show_session.tickets.using(DEFAULT_DB_ALIAS).values_list(
+        "row", "seat"
+    )
+    seat_map = {
+        "rows": dome.rows,
+        "seats_in_row": dome.seats_in_row,
+        "bitmap": build_bitmap(dome.rows, dome.seats_in_row, occupied),
+    }
+    get_seat_map_cache().set(
+        seat_map_cache_key(show_session.id), seat_map, SEAT_MAP_CACHE_TIMEOUT
+    )
+    return seat_map
+
+
+async def acache_seat_map(show_session):
+    """Async cache_seat_map"""
+    dome = show_session.planetarium_dome
+    occupied = [
+        pair
+        async for pair in show_session.tickets.using(
+            DEFAULT_DB_ALIAS
+        ).values_list("row", "seat")
+    ]
+    seat_map = {
+        "rows": dome.rows,
+        "seats_in_row": dome.seats_in_row,
+        "bitmap": build_bitmap(dome.rows, dome.seats_in_row, occupied),
+    }
+    await get_seat_map_cache().aset(
+        seat_map_cache_key(show_session.id), seat_map, SEAT_MAP_CACHE_TIMEOUT
+    )
+    return seat_map
+
+
+def invalidate_seat_maps(*show_session_ids):
+    """
+    Drop the seat maps now and once more on commit, so no map rebuilt
+    from tickets read before the commit outlives it
+    """
+    keys = [
+        seat_map_cache_key(show_session_id)
+        for show_session_id in show_session_ids
+        if show_session_id is not None
+    ]
+    if keys:
+        get_seat_map_cache().delete_many(keys)
+        transaction.on_commit(lambda: get_seat_map_cache().delete_many(keys))
+
+
+def encode_bitmap(bitmap):
+    return base64.b64encode(bitmap).decode("ascii")
@@ -1,5 +1,12 @@
+import datetime
+
+from django.conf import settings
+from django.db import transaction, IntegrityError
+from django.utils import timezone
 from rest_framework import serializers
 
+from planetarium.exceptions import SeatsTaken
+from planetarium.holds import claim_seats
 from planetarium.models import (
     ShowTheme,
     AstronomyShow,
@@ -7,7 +14,11 @@ from planetarium.models import (
     ShowSession,
     Reservation,
     Ticket,
+    SeatHold,
+    SessionRecurrence,
+    seat_lookup,
 )
+from planetarium.seat_map import invalidate_seat_maps
 
 
 class ShowThemeSerializer(serializers.ModelSerializer):
@@ -26,7 +37,7 @@ class AstronomyShowSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = AstronomyShow
-        fields = ("title", "description", "themes")
+        fields = ("title", "description", "duration", "themes")
 
 
 class PlanetariumDomeSerializer(serializers.ModelSerializer):
@@ -43,7 +54,7 @@ class AstronomyShowShortSerializer(serializers.ModelSerializer):
         fields = ("title", "themes")
 
     def get_themes(self, obj):
-        return ", ".join(obj.themes.values_list("name", flat=True))
+        return ", ".join(theme.name for theme in obj.themes.all())
 
 
 class PlanetariumDomeShortSerializer(serializers.ModelSerializer):
@@ -66,6 +77,7 @@ class ShowSessionListSerializer(serializers.ModelSerializer):
             "astronomy_show",
             "planetarium_dome",
             "show_time",
+            "end_time",
             "tickets_available",
         )
 
@@ -73,7 +85,13 @@ class ShowSessionListSerializer(serializers.ModelSerializer):
 class ShowSessionEditSerializer(serializers.ModelSerializer):
     class Meta:
         model = ShowSession
-        fields = ("id", "astronomy_show", "planetarium_dome", "show_time")
+        fields = (
+            "id",
+            "astronomy_show",
+            "planetarium_dome",
+            "show_time",
+            "end_time",
+        )
 
 
 class ShowSessionDetailSerializer(serializers.ModelSerializer):
@@ -96,6 +114,36 @@ class ReservationSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class ReservationShowSessionSerializer(serializers.ModelSerializer):
+    astronomy_show = AstronomyShowShortSerializer(many=False, read_only=True)
+    planetarium_dome = PlanetariumDomeShortSerializer(
+        many=False, read_only=True
+    )
+
+    class Meta:
+        model = ShowSession
+        fields = ("id", "show_time", "astronomy_show", "planetarium_dome")
+
+
+class ReservationTicketSerializer(serializers.ModelSerializer):
+    show_session = ReservationShowSessionSerializer(read_only=True)
+
+    class Meta:
+        model = Ticket
+        fields = ("id", "row", "seat", "show_session")
+
+
+class UserReservationSerializer(serializers.ModelSerializer):
+    created_at = serializers.DateTimeField(
+        format="%Y-%m-%d %H:%M:%S", read_only=True
+    )
+    tickets = ReservationTicketSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Reservation
+        fields = ("id", "created_at", "tickets")
+
+
 class TicketEditSerializer(serializers.ModelSerializer):
     reservation = ReservationSerializer(read_only=True)
 
@@ -103,6 +151,8 @@ class TicketEditSerializer(serializers.ModelSerializer):
         model = Ticket
         fields = ("row", "seat", "show_session", "reservation")
         read_only_fields = ("reservation",)
+        # taken seats are reported from the unique constraint on insert
+        validators = []
 
 
 class TicketSerializer(serializers.ModelSerializer):
@@ -113,3 +163,202 @@ class TicketSerializer(serializers.ModelSerializer):
         model = Ticket
         fields = ("id", "row", "seat", "show_session", "reservation")
         read_only_fields = ("reservation",)
+
+
+class SeatSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class SeatBatchSerializer(serializers.Serializer):
+    show_session = serializers.PrimaryKeyRelatedField(
+        queryset=ShowSession.objects.select_related("planetarium_dome")
+    )
+    seats = SeatSerializer(many=True, allow_empty=False)
+
+    def validate(self, attrs):
+        planetarium_dome = attrs["show_session"].planetarium_dome
+        requested = set()
+        for seat in attrs["seats"]:
+            Ticket.validate_ticket(seat["row"], seat["seat"], planetarium_dome)
+            if (seat["row"], seat["seat"]) in requested:
+                raise serializers.ValidationError(
+                    {
+                        "seats": f"row {seat['row']}, seat {seat['seat']} "
+                        f"is requested more than once"
+                    }
+                )
+            requested.add((seat["row"], seat["seat"]))
+        return attrs
+
+
+class TicketBatchSerializer(SeatBatchSerializer):
+    reservation = ReservationSerializer(read_only=True)
+
+    def create(self, validated_data):
+        """Book all seats under one reservation or none of them"""
+        show_session = validated_data["show_session"]
+        seats = [
+            (seat["row"], seat["seat"]) for seat in validated_data["seats"]
+        ]
+        try:
+            with transaction.atomic():
+                claim_seats(show_session.id, seats, validated_data["user"])
+                reservation = Reservation.objects.create(
+                    user=validated_data["user"]
+                )
+                tickets = Ticket.objects.bulk_create(
+                    Ticket(
+                        show_session=show_session,
+                        reservation=reservation,
+                        row=row,
+                        seat=seat,
+                    )
+                    for row, seat in seats
+                )
+                ShowSession.add_tickets_sold(show_session.id, len(tickets))
+        except IntegrityError:
+            raise SeatsTaken(
+                show_session.tickets.filter(seat_lookup(seats)).values_list(
+                    "row", "seat"
+                )
+            )
+        invalidate_seat_maps(show_session.id)
+        return {
+            "show_session": show_session,
+            "seats": tickets,
+            "reservation": reservation,
+        }
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SeatHold
+        fields = ("id", "show_session", "row", "seat", "expires_at")
+
+
+class SeatHoldBatchSerializer(SeatBatchSerializer):
+    expires_at = serializers.DateTimeField(read_only=True)
+
+    def create(self, validated_data):
+        """Hold all seats for SEAT_HOLD_MINUTES or none of them"""
+        show_session = validated_data["show_session"]
+        user = validated_data["user"]
+        seats = [
+            (seat["row"], seat["seat"]) for seat in validated_data["seats"]
+        ]
+        expires_at = timezone.now() + datetime.timedelta(
+            minutes=settings.SEAT_HOLD_MINUTES
+        )
+        with transaction.atomic():
+            claim_seats(show_session.id, seats, user)
+            taken = list(
+                show_session.tickets.filter(seat_lookup(seats)).values_list(
+                    "row", "seat"
+                )
+            )
+            if taken:
+                raise SeatsTaken(taken)
+            holds = SeatHold.objects.bulk_create(
+                SeatHold(
+                    show_session=show_session,
+                    user=user,
+                    row=row,
+                    seat=seat,
+                    expires_at=expires_at,
+                )
+                for row, seat in seats
+            )
+        return {
+            "show_session": show_session,
+            "seats": holds,
+            "expires_at": expires_at,
+        }
+
+
+class SeatHoldCheckoutSerializer(serializers.Serializer):
+    show_session = serializers.PrimaryKeyRelatedField(
+        queryset=ShowSession.objects.all()
+    )
+    seats = SeatSerializer(many=True, read_only=True)
+    reservation = ReservationSerializer(read_only=True)
+
+    def create(self, validated_data):
+        """Turn the user's active holds on a session into tickets"""
+        show_session = validated_data["show_session"]
+        user = validated_data["user"]
+        try:
+            with transaction.atomic():
+                # holds being converted by a concurrent request are skipped
+                holds = list(
+                    SeatHold.objects.select_for_update(skip_locked=True)
+                    .filter(
+                        show_session=show_session,
+                        user=user,
+                        expires_at__gt=timezone.now(),
+                    )
+                    .order_by()
+                )
+                if not holds:
+                    raise serializers.ValidationError(
+                        {"show_session": "You hold no seats for this session."}
+                    )
+                reservation = Reservation.objects.create(user=user)
+                tickets = Ticket.objects.bulk_create(
+                    Ticket(
+                        show_session=show_session,
+                        reservation=reservation,
+                        row=hold.row,
+                        seat=hold.seat,
+                    )
+                    for hold in holds
+                )
+                SeatHold.objects.filter(
+                    id__in=[hold.id for hold in holds]
+                ).delete()
+                ShowSession.add_tickets_sold(show_session.id, len(tickets))
+        except IntegrityError:
+            raise SeatsTaken(
+                show_session.tickets.filter(
+                    seat_lookup((hold.row, hold.seat) for hold in holds)
+                ).values_list("row", "seat")
+            )
+        invalidate_seat_maps(show_session.id)
+        return {
+            "show_session": show_session,
+            "seats": tickets,
+            "reservation": reservation,
+        }
+
+
+class SessionRecurrenceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SessionRecurrence
+        fields = (
+            "id",
+            "astronomy_show",
+            "planetarium_dome",
+            "weekdays",
+            "start_time",
+            "starts_on",
+            "ends_on",
+        )
+
+    def validate(self, attrs):
+        weekdays = attrs.get(
+            "weekdays", getattr(self.instance, "weekdays", [])
+        )
+        if not weekdays:
+            raise serializers.ValidationError(
+                {"weekdays": "At least one weekday is required."}
+            )
+        starts_on = attrs.get(
+            "starts_on", getattr(self.instance, "starts_on", None)
+        )
+        ends_on = attrs.get("ends_on", getattr(self.instance, "ends_on", None))
+        if starts_on > ends_on:
+            raise serializers.ValidationError(
+                {"ends_on": "ends_on must not be before starts_on."}
+            )
+        return attrs
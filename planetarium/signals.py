@@ -0,0 +1,86 @@
+from django.db.models.signals import (
+    post_save,
+    post_delete,
+    pre_delete,
+    m2m_changed,
+)
+from django.db.models.functions import Now
+from django.dispatch import receiver
+
+from planetarium.catalog_cache import bump_versions
+from planetarium.models import (
+    ShowTheme,
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Ticket,
+)
+from planetarium.seat_map import invalidate_seat_maps
+
+
+@receiver([post_save, post_delete], sender=Ticket)
+def invalidate_ticket_seat_map(sender, instance, **kwargs):
+    invalidate_seat_maps(instance.show_session_id)
+
+
+@receiver(post_save, sender=Ticket)
+def count_sold_ticket(sender, instance, created, **kwargs):
+    if created:
+        ShowSession.add_tickets_sold(instance.show_session_id, 1)
+
+
+@receiver(post_delete, sender=Ticket)
+def count_released_ticket(sender, instance, **kwargs):
+    ShowSession.add_tickets_sold(instance.show_session_id, -1)
+
+
+@receiver(post_save, sender=ShowSession)
+def invalidate_session_seat_map(sender, instance, **kwargs):
+    invalidate_seat_maps(instance.id)
+    PlanetariumDome.invalidate_shapes(instance.id)
+
+
+@receiver(post_save, sender=PlanetariumDome)
+def invalidate_dome_seat_maps(sender, instance, **kwargs):
+    show_session_ids = list(instance.domes.values_list("id", flat=True))
+    invalidate_seat_maps(*show_session_ids)
+    PlanetariumDome.invalidate_shapes(*show_session_ids)
+
+
+@receiver(post_save, sender=AstronomyShow)
+def index_astronomy_show(sender, instance, update_fields, **kwargs):
+    if update_fields is None or {"title", "description"} & update_fields:
+        AstronomyShow.update_search_vector(instance.id)
+
+
+@receiver([post_save, post_delete], sender=ShowTheme)
+def invalidate_themes(sender, **kwargs):
+    # shows are rendered with their theme names
+    bump_versions(ShowTheme, AstronomyShow)
+
+
+@receiver(pre_delete, sender=ShowTheme)
+def touch_theme_shows(sender, instance, **kwargs):
+    # deleting the theme drops its through rows without m2m_changed
+    instance.shows.update(updated_at=Now())
+
+
+@receiver([post_save, post_delete], sender=AstronomyShow)
+@receiver(m2m_changed, sender=AstronomyShow.themes.through)
+def invalidate_shows(sender, **kwargs):
+    bump_versions(AstronomyShow)
+
+
+@receiver(m2m_changed, sender=AstronomyShow.themes.through)
+def touch_shows(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        AstronomyShow.objects.filter(id=instance.id).update(updated_at=Now())
+    elif reverse and action in ("post_add", "post_remove"):
+        AstronomyShow.objects.filter(id__in=pk_set).update(updated_at=Now())
+    elif reverse and action == "pre_clear":
+        instance.shows.update(updated_at=Now())
+
+
+@receiver([post_save, post_delete], sender=PlanetariumDome)
+def invalidate_domes(sender, **kwargs):
+    bump_versions(PlanetariumDome)
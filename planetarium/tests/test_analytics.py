@@ -0,0 +1,201 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Reservation,
+    SessionOccupancy,
+    Ticket,
+)
+
+# a Monday
+START = datetime.datetime(2024, 1, 1, 18, tzinfo=datetime.timezone.utc)
+
+
+class OccupancyRollupTests(TestCase):
+    def setUp(self) -> None:
+        self.dome = PlanetariumDome.objects.create(
+            name="TestDome", rows=2, seats_in_row=5
+        )
+        self.show = AstronomyShow.objects.create(
+            title="TestTitle", description="TestDescription"
+        )
+        self.sessions = [
+            ShowSession.objects.create(
+                astronomy_show=self.show,
+                planetarium_dome=self.dome,
+                show_time=START + datetime.timedelta(days=day),
+            )
+            for day in range(3)
+        ]
+
+    @staticmethod
+    def backdate(hours, *sessions):
+        past = timezone.now() - datetime.timedelta(hours=hours)
+        ShowSession.objects.filter(
+            id__in=[session.id for session in sessions]
+        ).update(updated_at=past)
+
+    def test_refresh_rolls_up_scheduled_sessions(self):
+        ShowSession.objects.create(
+            astronomy_show=self.show, planetarium_dome=self.dome
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                row=1,
+                seat=1,
+                show_session=self.sessions[0],
+                reservation=Reservation.objects.create(),
+            )
+
+        self.assertEqual(SessionOccupancy.refresh(), 3)
+        occupancy = SessionOccupancy.objects.get(show_session=self.sessions[0])
+        self.assertEqual(occupancy.seats, 10)
+        self.assertEqual(occupancy.tickets_sold, 1)
+
+    def test_refresh_only_reads_sessions_changed_since_the_watermark(self):
+        PlanetariumDome.objects.update(
+            updated_at=timezone.now() - datetime.timedelta(hours=2)
+        )
+        self.backdate(2, *self.sessions)
+        self.backdate(1, self.sessions[0])
+        SessionOccupancy.refresh()
+
+        # only the session changed within the overlap of the watermark
+
+        self.assertEqual(SessionOccupancy.refresh(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                row=1,
+                seat=1,
+                show_session=self.sessions[2],
+                reservation=Reservation.objects.create(),
+            )
+        self.assertEqual(SessionOccupancy.refresh(), 2)
+        self.assertEqual(
+            SessionOccupancy.objects.get(
+                show_session=self.sessions[2]
+            ).tickets_sold,
+            1,
+        )
+        self.assertEqual(SessionOccupancy.refresh(full=True), 3)
+
+
+class OccupancyReportApiTests(TestCase):
+    def setUp(self) -> None:
+        dome = PlanetariumDome.objects.create(
+            name="TestDome", rows=2, seats_in_row=5
+        )
+        self.shows = [
+            AstronomyShow.objects.create(
+                title=title, description="TestDescription"
+            )
+            for title in ("Alpha", "Beta")
+        ]
+        reservation = Reservation.objects.create()
+        # Alpha on Monday and Tuesday, Beta the next Monday
+        for show, day, sold in (
+            (self.shows[0], 0, 2),
+            (self.shows[0], 1, 5),
+            (self.shows[1], 7, 1),
+        ):
+            session = ShowSession.objects.create(
+                astronomy_show=show,
+                planetarium_dome=dome,
+                show_time=START + datetime.timedelta(days=day),
+            )
+            with self.captureOnCommitCallbacks(execute=True):
+                for seat in range(1, sold + 1):
+                    Ticket.objects.create(
+                        row=1,
+                        seat=seat,
+                        show_session=session,
+                        reservation=reservation,
+                    )
+        SessionOccupancy.refresh()
+
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="admin@tests.test", password="testUser123", is_staff=True
+            )
+        )
+
+    def report(self, name, **params):
+        res = self.client.get(reverse(f"planetarium:occupancy-{name}"), params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data["results"]
+
+    def test_shows(self):
+        self.assertEqual(
+            self.report("shows"),
+            [
+                {
+                    "astronomy_show": self.shows[0].id,
+                    "title": "Alpha",
+                    "sessions": 2,
+                    "seats": 20,
+                    "tickets_sold": 7,
+                    "occupancy": 0.35,
+                },
+                {
+                    "astronomy_show": self.shows[1].id,
+                    "title": "Beta",
+                    "sessions": 1,
+                    "seats": 10,
+                    "tickets_sold": 1,
+                    "occupancy": 0.1,
+                },
+            ],
+        )
+
+    def test_days_and_weeks(self):
+        self.assertEqual(
+            [
+                (row["day"].isoformat(), row["tickets_sold"])
+                for row in self.report("days")
+            ],
+            [("2024-01-01", 2), ("2024-01-02", 5), ("2024-01-08", 1)],
+        )
+        self.assertEqual(
+            [
+                (row["week"].isoformat(), row["tickets_sold"])
+                for row in self.report("weeks")
+            ],
+            [("2024-01-01", 7), ("2024-01-08", 1)],
+        )
+
+    def test_filters(self):
+        rows = self.report(
+            "domes", date_from="2024-01-02", date_to="2024-01-07"
+        )
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["name"], "TestDome")
+        self.assertEqual(rows[0]["tickets_sold"], 5)
+        self.assertEqual(
+            len(self.report("sessions", show=str(self.shows[1].id))), 1
+        )
+
+    def test_reports_read_only_the_rollups(self):
+        with self.assertNumQueries(2):
+            self.report("days")
+
+    def test_staff_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test2user@tests.test", password="testUser123"
+            )
+        )
+
+        res = self.client.get(reverse("planetarium:occupancy-days"))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
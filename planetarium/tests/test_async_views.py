@@ -0,0 +1,182 @@
+import base64
+import datetime
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.tokens import AccessToken
+
+from planetarium.models import (
+    ShowTheme,
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Reservation,
+    Ticket,
+)
+from planetarium.seat_map import get_seat_map_cache
+from planetarium.throttling import THROTTLE_CACHE
+
+SESSIONS_URL = reverse("planetarium:async:session-list")
+THEMES_URL = reverse("planetarium:async:theme-list")
+SHOWS_URL = reverse("planetarium:async:show-list")
+
+
+def session_url(session_id):
+    return reverse("planetarium:async:session-detail", args=[session_id])
+
+
+def seats_url(session_id):
+    return reverse("planetarium:async:session-seats", args=[session_id])
+
+
+class AsyncViewsTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        caches["dome_shape"].clear()
+        get_seat_map_cache().clear()
+        caches[THROTTLE_CACHE].clear()
+        theme = ShowTheme.objects.create(name="Galaxies")
+        self.show = AstronomyShow.objects.create(
+            title="Milky Way", description="TestDescription"
+        )
+        self.show.themes.add(theme)
+        self.dome = PlanetariumDome.objects.create(
+            name="TestDome", rows=2, seats_in_row=4
+        )
+        start = timezone.now() + datetime.timedelta(days=1)
+        self.sessions = [
+            ShowSession.objects.create(
+                astronomy_show=self.show,
+                planetarium_dome=self.dome,
+                show_time=start + datetime.timedelta(hours=hour),
+            )
+            for hour in range(5)
+        ]
+        Ticket.objects.create(
+            row=2,
+            seat=3,
+            show_session=self.sessions[0],
+            reservation=Reservation.objects.create(),
+        )
+
+        user = get_user_model().objects.create_user(
+            email="test2user@tests.test", password="testUser123"
+        )
+        self.headers = {
+            "Authorization": f"Bearer {AccessToken.for_user(user)}"
+        }
+
+    async def test_session_list_pages_by_cursor(self):
+        ids = []
+        url = f"{SESSIONS_URL}?page_size=2"
+        while url:
+            res = await self.async_client.get(url, headers=self.headers)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            page = res.json()
+            self.assertLessEqual(len(page["results"]), 2)
+            ids.extend(session["id"] for session in page["results"])
+            url = page["next"]
+
+        self.assertEqual(ids, [session.id for session in self.sessions])
+
+    async def test_session_list_rejects_invalid_cursor(self):
+        res = await self.async_client.get(
+            f"{SESSIONS_URL}?cursor=invalid", headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("cursor", res.json())
+
+    async def test_session_detail(self):
+        res = await self.async_client.get(
+            session_url(self.sessions[0].id), headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["id"], self.sessions[0].id)
+        self.assertEqual(res.json()["astronomy_show"]["title"], "Milky Way")
+        self.assertEqual(res.json()["planetarium_dome"]["capacity"], 8)
+
+    async def test_session_seats(self):
+        res = await self.async_client.get(
+            seats_url(self.sessions[0].id), headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        # bit 6 of 8 is set
+        self.assertEqual(
+            base64.b64decode(res.json()["bitmap"]), bytes([0b00000010])
+        )
+
+        res = await self.async_client.get(
+            f"{seats_url(self.sessions[0].id)}?encoding=json",
+            headers=self.headers,
+        )
+        self.assertEqual(res.json()["taken"], [[2, 3]])
+
+    async def test_catalog(self):
+        res = await self.async_client.get(THEMES_URL, headers=self.headers)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([theme["name"] for theme in res.json()], ["Galaxies"])
+
+        res = await self.async_client.get(
+            f"{SHOWS_URL}?q=milky", headers=self.headers
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.json(),
+            [
+                {
+                    "title": "Milky Way",
+                    "description": "TestDescription",
+                    "duration": "01:00:00",
+                    "themes": ["Galaxies"],
+                }
+            ],
+        )
+
+        res = await self.async_client.get(
+            reverse("planetarium:async:dome-detail", args=[self.dome.id]),
+            headers=self.headers,
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["name"], "TestDome")
+
+    async def test_auth_required(self):
+        res = await self.async_client.get(SESSIONS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_read_only(self):
+        res = await self.async_client.post(THEMES_URL, headers=self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def test_throttled_response(self):
+        with mock.patch.object(
+            SimpleRateThrottle,
+            "THROTTLE_RATES",
+            {"anon": "2/hour", "user": "2/hour"},
+        ):
+            for _ in range(2):
+                res = await self.async_client.get(
+                    THEMES_URL, headers=self.headers
+                )
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+            res = await self.async_client.get(SHOWS_URL, headers=self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res.headers)
+
+    async def test_unknown_session(self):
+        res = await self.async_client.get(
+            session_url(self.sessions[-1].id + 100), headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from planetarium.benchmark import percentile
+from planetarium.models import (
+    ShowTheme,
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+)
+
+
+class PercentileTests(TransactionTestCase):
+    def test_percentile_interpolates(self):
+        values = [10, 20, 30, 40]
+
+        self.assertEqual(percentile(values, 0), 10)
+        self.assertEqual(percentile(values, 0.5), 25)
+        self.assertEqual(percentile(values, 1), 40)
+
+
+class BenchmarkCommandTests(TransactionTestCase):
+    def setUp(self) -> None:
+        theme = ShowTheme.objects.create(name="TestTheme")
+        show = AstronomyShow.objects.create(
+            title="Black holes", description="A show about stars"
+        )
+        show.themes.add(theme)
+        dome = PlanetariumDome.objects.create(
+            name="TestDome", rows=5, seats_in_row=10
+        )
+        ShowSession.objects.create(
+            astronomy_show=show,
+            planetarium_dome=dome,
+            show_time=timezone.now() + timezone.timedelta(days=1),
+        )
+        output = tempfile.NamedTemporaryFile(suffix=".json", delete=False)
+        output.close()
+        self.output = output.name
+        self.addCleanup(os.remove, self.output)
+
+    def test_benchmark_reports_every_workload(self):
+        call_command(
+            "benchmark",
+            "--concurrency=2",
+            "--iterations=2",
+            f"--output={self.output}",
+            "--seed=1",
+            stdout=StringIO(),
+        )
+
+        with open(self.output) as file:
+            results = json.load(file)
+        self.assertEqual(
+            list(results["workloads"]),
+            ["browse", "sessions", "account", "booking", "auth"],
+        )
+        endpoints = results["workloads"]["browse"]["endpoints"]
+        self.assertEqual(endpoints["GET /api/theme/"]["requests"], 4)
+        self.assertEqual(endpoints["GET /api/theme/"]["errors"], 0)
+        self.assertIsNotNone(endpoints["GET /api/show/{id}/"]["queries"])
+        booking = results["workloads"]["booking"]["endpoints"]
+        self.assertEqual(booking["GET /api/session/{id}/seats/"]["errors"], 0)
+        self.assertFalse(
+            ShowSession.objects.filter(tickets_sold__gt=0).exists()
+        )
+
+    def test_compare_flags_query_regressions(self):
+        call_command(
+            "benchmark",
+            "--workload=browse",
+            "--iterations=1",
+            "--concurrency=1",
+            f"--output={self.output}",
+            stdout=StringIO(),
+        )
+        with open(self.output) as file:
+            baseline = json.load(file)
+        for endpoint in baseline["workloads"]["browse"]["endpoints"].values():
+            endpoint["queries"] = 0
+        with open(self.output, "w") as file:
+            json.dump(baseline, file)
+
+        with self.assertRaisesMessage(Exception, "queries 0 ->"):
+            call_command(
+                "benchmark",
+                "--workload=browse",
+                "--iterations=1",
+                "--concurrency=1",
+                f"--output={self.output}.new",
+                f"--compare={self.output}",
+                stdout=StringIO(),
+            )
+        os.remove(f"{self.output}.new")
@@ -0,0 +1,146 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Reservation,
+    Ticket,
+)
+
+BOOK_URL = reverse("planetarium:ticket-book")
+TICKETS_URL = reverse("planetarium:ticket-list")
+
+
+class BatchBookingApiTests(TestCase):
+    def setUp(self) -> None:
+        show = AstronomyShow.objects.create(
+            title="TestTitle", description="TestDescription"
+        )
+        dome = PlanetariumDome.objects.create(
+            name="TestName", rows=5, seats_in_row=10
+        )
+        self.session = ShowSession.objects.create(
+            astronomy_show=show, planetarium_dome=dome
+        )
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test2user@tests.test", password="testUser123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def book(self, *seats):
+        payload = {
+            "show_session": self.session.id,
+            "seats": [{"row": row, "seat": seat} for row, seat in seats],
+        }
+        return self.client.post(BOOK_URL, payload, format="json")
+
+    def test_books_all_seats_under_one_reservation(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.book((1, 1), (1, 2), (1, 3), (1, 4))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["seats"]), 4)
+        reservation = Reservation.objects.get(user=self.user)
+        self.assertEqual(reservation.tickets.count(), 4)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.tickets_sold, 4)
+
+    def test_out_of_range_seat_books_nothing(self):
+        res = self.book((1, 1), (6, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_duplicate_seat_in_request(self):
+        res = self.book((2, 2), (2, 2))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_taken_seat_books_nothing(self):
+        Ticket.objects.create(
+            row=3,
+            seat=3,
+            show_session=self.session,
+            reservation=Reservation.objects.create(),
+        )
+
+        res = self.book((3, 2), (3, 3))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["seats"], [{"row": 3, "seat": 3}])
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertFalse(Reservation.objects.filter(user=self.user).exists())
+
+
+class SingleTicketApiTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        caches["dome_shape"].clear()
+        show = AstronomyShow.objects.create(
+            title="TestTitle", description="TestDescription"
+        )
+        dome = PlanetariumDome.objects.create(
+            name="TestName", rows=5, seats_in_row=10
+        )
+        self.session = ShowSession.objects.create(
+            astronomy_show=show, planetarium_dome=dome
+        )
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test2user@tests.test", password="testUser123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_taken_seat_conflicts(self):
+        payload = {"row": 2, "seat": 3, "show_session": self.session.id}
+        res = self.client.post(TICKETS_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.post(TICKETS_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["seats"], [{"row": 2, "seat": 3}])
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_dome_shape_is_cached(self):
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            show_session=self.session,
+            reservation=Reservation.objects.create(),
+        )
+
+        # savepoint, INSERT, release: no dome SELECT, no uniqueness SELECT
+        # and the sold counter UPDATE waits for the commit
+        with self.assertNumQueries(3):
+            Ticket.objects.create(row=1, seat=2, show_session=self.session)
+
+    def test_shapes_read_before_commit_are_dropped(self):
+        dome = self.session.planetarium_dome
+        with self.captureOnCommitCallbacks(execute=True):
+            dome.rows = 6
+            dome.save()
+            # a request reading the old shape before the commit
+            caches["dome_shape"].set(
+                PlanetariumDome.shape_cache_key(self.session.id), (5, 10)
+            )
+
+        self.assertEqual(PlanetariumDome.get_shape(self.session.id), (6, 10))
+
+    def test_dome_resize_is_seen(self):
+        Ticket.objects.create(row=1, seat=1, show_session=self.session)
+        dome = self.session.planetarium_dome
+        dome.rows = 6
+        dome.save()
+
+        Ticket.objects.create(row=6, seat=1, show_session=self.session)
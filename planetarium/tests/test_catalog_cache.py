@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from planetarium.models import ShowTheme, AstronomyShow, PlanetariumDome
+
+THEMES_URL = reverse("planetarium:showtheme-list")
+SHOWS_URL = reverse("planetarium:astronomyshow-list")
+DOMES_URL = reverse("planetarium:planetariumdome-list")
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self) -> None:
+        caches["catalog"].clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="admin@tests.test",
+            password="testUser123",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_hot_read_does_not_query(self):
+        PlanetariumDome.objects.create(name="Dome", rows=5, seats_in_row=10)
+        self.client.get(DOMES_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(DOMES_URL)
+        self.assertEqual(len(res.data), 1)
+
+    def test_query_params_are_part_of_key(self):
+        ShowTheme.objects.create(name="Stars")
+        ShowTheme.objects.create(name="Moon")
+
+        self.assertEqual(len(self.client.get(THEMES_URL).data), 2)
+        res = self.client.get(THEMES_URL, {"name": "moon"})
+        self.assertEqual([theme["name"] for theme in res.data], ["Moon"])
+
+    def test_write_through_api_is_visible(self):
+        self.client.get(THEMES_URL)
+        self.client.post(THEMES_URL, {"name": "Comets"})
+
+        res = self.client.get(THEMES_URL)
+        self.assertEqual([theme["name"] for theme in res.data], ["Comets"])
+
+    def test_theme_rename_invalidates_shows(self):
+        theme = ShowTheme.objects.create(name="Stars")
+        show = AstronomyShow.objects.create(title="Show", description="-")
+        show.themes.add(theme)
+        self.assertEqual(
+            self.client.get(SHOWS_URL).data[0]["themes"], ["Stars"]
+        )
+
+        theme.name = "Galaxies"
+        theme.save()
+
+        res = self.client.get(SHOWS_URL)
+        self.assertEqual(res.data[0]["themes"], ["Galaxies"])
+
+    def test_m2m_change_invalidates_shows(self):
+        show = AstronomyShow.objects.create(title="Show", description="-")
+        self.client.get(SHOWS_URL)
+
+        show.themes.add(ShowTheme.objects.create(name="Moon"))
+
+        res = self.client.get(SHOWS_URL)
+        self.assertEqual(res.data[0]["themes"], ["Moon"])
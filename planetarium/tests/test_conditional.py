@@ -0,0 +1,186 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from planetarium.models import (
+    ShowTheme,
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Reservation,
+    Ticket,
+)
+
+THEMES_URL = reverse("planetarium:showtheme-list")
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        caches["dome_shape"].clear()
+        caches["catalog"].clear()
+        caches["seat_map"].clear()
+        self.show = AstronomyShow.objects.create(
+            title="TestTitle", description="TestDescription"
+        )
+        dome = PlanetariumDome.objects.create(
+            name="TestName", rows=5, seats_in_row=10
+        )
+        self.session = ShowSession.objects.create(
+            astronomy_show=self.show,
+            planetarium_dome=dome,
+            show_time=timezone.now(),
+        )
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test2user@tests.test", password="testUser123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def assertRevalidates(self, url, change):
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        etag = res.headers["ETag"]
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+
+        change()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.headers["ETag"], etag)
+
+    def book_seat(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                row=1,
+                seat=1,
+                show_session=self.session,
+                reservation=Reservation.objects.create(user=self.user),
+            )
+
+    def test_session_detail(self):
+        self.assertRevalidates(
+            reverse("planetarium:showsession-detail", args=[self.session.id]),
+            self.book_seat,
+        )
+
+    def test_session_detail_follows_show(self):
+        def rename_show():
+            self.show.title = "NewTitle"
+            self.show.save()
+
+        self.assertRevalidates(
+            reverse("planetarium:showsession-detail", args=[self.session.id]),
+            rename_show,
+        )
+
+    def test_ticket_list_follows_show_and_dome(self):
+        self.book_seat()
+
+        def rename_show():
+            self.show.title = "NewTitle"
+            self.show.save()
+
+        def rename_dome():
+            dome = self.session.planetarium_dome
+            dome.name = "NewName"
+            dome.save()
+
+        for change in (rename_show, rename_dome):
+            with self.subTest(change=change.__name__):
+                self.assertRevalidates(
+                    reverse("planetarium:ticket-list"), change
+                )
+
+    def test_reservation_list_follows_user_emails(self):
+        other = get_user_model().objects.create_user(
+            email="a@tests.test", password="testUser123"
+        )
+        Reservation.objects.create(user=self.user)
+        Reservation.objects.create(user=other)
+
+        def rename_other():
+            # below the other email, the greatest one stays the same
+            other.email = "b@tests.test"
+            other.save()
+
+        self.assertRevalidates(
+            reverse("planetarium:reservation-list"), rename_other
+        )
+
+    def test_show_list_follows_deleted_themes(self):
+        old, new = (
+            ShowTheme.objects.create(name=name) for name in ("Old", "New")
+        )
+        self.show.themes.add(old, new)
+
+        self.assertRevalidates(
+            reverse("planetarium:astronomyshow-list"), old.delete
+        )
+
+    def test_seat_map(self):
+        self.assertRevalidates(
+            reverse("planetarium:showsession-seats", args=[self.session.id]),
+            self.book_seat,
+        )
+
+    def test_catalog_list(self):
+        self.assertRevalidates(
+            THEMES_URL, lambda: ShowTheme.objects.create(name="Stars")
+        )
+
+    def test_session_list_covers_its_page(self):
+        later = ShowSession.objects.create(
+            astronomy_show=self.show,
+            planetarium_dome=PlanetariumDome.objects.create(
+                name="OtherDome", rows=5, seats_in_row=10
+            ),
+            show_time=self.session.show_time + datetime.timedelta(days=1),
+        )
+        url = f"{reverse('planetarium:showsession-list')}?page_size=1"
+        etag = self.client.get(url).headers["ETag"]
+
+        # the second page changes, the first does not
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            show_session=later,
+            reservation=Reservation.objects.create(user=self.user),
+        )
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.assertRevalidates(url, self.book_seat)
+
+    def test_not_modified_skips_serialization(self):
+        etag = self.client.get(THEMES_URL).headers["ETag"]
+
+        with self.assertNumQueries(0):
+            res = self.client.get(THEMES_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_last_modified(self):
+        url = reverse("planetarium:showsession-detail", args=[self.session.id])
+        res = self.client.get(url)
+
+        res = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=res.headers["Last-Modified"]
+        )
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_missing_object(self):
+        url = reverse(
+            "planetarium:showsession-detail", args=[self.session.id + 1]
+        )
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn("ETag", res.headers)
@@ -0,0 +1,91 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from planetarium.metrics import registry
+from planetarium_service.db.pool import (
+    ConnectionPool,
+    PoolTimeout,
+    get_pool,
+    pools,
+)
+
+
+class FakeInfo:
+    transaction_status = 0
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.info = FakeInfo()
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = 0
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def test_connections_are_reused(self):
+        pool = ConnectionPool(max_size=2)
+        connection = pool.getconn(FakeConnection)
+        pool.putconn(connection)
+
+        self.assertIs(pool.getconn(FakeConnection), connection)
+        self.assertEqual(pool.stats()["size"], 1)
+        self.assertEqual(pool.stats()["checkouts"], 2)
+
+    def test_checkout_waits_for_a_free_connection(self):
+        pool = ConnectionPool(max_size=1, timeout=5)
+        connection = pool.getconn(FakeConnection)
+        timer = threading.Timer(0.05, pool.putconn, [connection])
+        timer.start()
+
+        self.assertIs(pool.getconn(FakeConnection), connection)
+        self.assertGreater(pool.stats()["wait_seconds"], 0)
+        timer.join()
+
+    def test_checkout_times_out_when_exhausted(self):
+        pool = ConnectionPool(max_size=1, timeout=0.01)
+        pool.getconn(FakeConnection)
+
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(FakeConnection)
+        self.assertEqual(pool.stats()["timeouts"], 1)
+
+    def test_broken_connections_are_replaced(self):
+        pool = ConnectionPool(max_size=1)
+        connection = pool.getconn(FakeConnection)
+        connection.closed = 1
+        pool.putconn(connection)
+
+        replacement = pool.getconn(FakeConnection)
+        self.assertIsNot(replacement, connection)
+        self.assertEqual(pool.stats()["size"], 1)
+
+    def test_open_transactions_are_rolled_back(self):
+        pool = ConnectionPool(max_size=1)
+        connection = pool.getconn(FakeConnection)
+        connection.info.transaction_status = 2
+        pool.putconn(connection)
+
+        self.assertEqual(connection.rollbacks, 1)
+        self.assertEqual(pool.stats()["idle"], 1)
+
+    def test_pool_stats_in_metrics(self):
+        self.addCleanup(pools.pop, ("test", "planetarium"), None)
+        pool = get_pool("test", "planetarium", max_size=3)
+        pool.getconn(FakeConnection)
+
+        body = registry.expose()
+
+        labels = 'alias="test",database="planetarium"'
+        self.assertIn(f"planetarium_db_pool_in_use{{{labels}}} 1", body)
+        self.assertIn(f"planetarium_db_pool_max_size{{{labels}}} 3", body)
+        self.assertIn(
+            f"planetarium_db_pool_checkouts_total{{{labels}}} 1", body
+        )
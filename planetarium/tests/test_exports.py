@@ -0,0 +1,143 @@
+import datetime
+import json
+import warnings
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Reservation,
+    Ticket,
+)
+
+TICKETS_URL = reverse("planetarium:export-tickets")
+RESERVATIONS_URL = reverse("planetarium:export-reservations")
+
+
+class ExportApiTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="admin@tests.test", password="testUser123", is_staff=True
+        )
+        dome = PlanetariumDome.objects.create(
+            name="TestDome", rows=2, seats_in_row=5
+        )
+        self.shows = [
+            AstronomyShow.objects.create(
+                title=title, description="TestDescription"
+            )
+            for title in ("Alpha", "Beta")
+        ]
+        self.reservation = Reservation.objects.create(user=self.user)
+        for day, show in enumerate(self.shows):
+            session = ShowSession.objects.create(
+                astronomy_show=show,
+                planetarium_dome=dome,
+                show_time=datetime.datetime(
+                    2024, 1, 1 + day, 18, tzinfo=datetime.timezone.utc
+                ),
+            )
+            for seat in (1, 2):
+                Ticket.objects.create(
+                    row=1,
+                    seat=seat,
+                    show_session=session,
+                    reservation=self.reservation,
+                )
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def export(self, url, **params):
+        res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return b"".join(res.streaming_content).decode(), res
+
+    def test_tickets_csv(self):
+        content, res = self.export(TICKETS_URL, format="csv")
+
+        self.assertEqual(res["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn('filename="tickets.csv"', res["Content-Disposition"])
+        lines = content.splitlines()
+        self.assertEqual(
+            lines[0],
+            "id,reservation,reserved_at,user,show_session,show_time,"
+            "show,dome,row,seat",
+        )
+        self.assertEqual(len(lines), 5)
+        self.assertIn(",admin@tests.test,", lines[1])
+        self.assertTrue(lines[1].endswith(",Alpha,TestDome,1,1"))
+
+    def test_tickets_ndjson_filters(self):
+        content, res = self.export(
+            TICKETS_URL, format="ndjson", show=str(self.shows[1].id)
+        )
+
+        self.assertEqual(
+            res["Content-Type"], "application/x-ndjson; charset=utf-8"
+        )
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row["seat"] for row in rows], [1, 2])
+        self.assertEqual({row["show"] for row in rows}, {"Beta"})
+
+        content, res = self.export(
+            TICKETS_URL, format="ndjson", date_to="2024-01-01"
+        )
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual({row["show"] for row in rows}, {"Alpha"})
+
+    def test_reservations(self):
+        Reservation.objects.create()
+        content, res = self.export(RESERVATIONS_URL, format="ndjson")
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["id"], self.reservation.id)
+        self.assertEqual(rows[0]["user"], "admin@tests.test")
+        self.assertIsNone(rows[1]["user"])
+
+        content, res = self.export(
+            RESERVATIONS_URL, format="csv", date_to="2000-01-01"
+        )
+        self.assertEqual(content.splitlines(), ["id,created_at,user"])
+
+    def test_staff_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test2user@tests.test", password="testUser123"
+            )
+        )
+
+        res = self.client.get(TICKETS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    @mock.patch("planetarium.exports.EXPORT_CHUNK_SIZE", 1)
+    async def test_tickets_are_streamed_under_asgi(self):
+        headers = {
+            "Authorization": f"Bearer {AccessToken.for_user(self.user)}"
+        }
+
+        with warnings.catch_warnings():
+            # consuming a sync iterator under ASGI warns
+            warnings.filterwarnings(
+                "error", "StreamingHttpResponse must consume"
+            )
+            res = await self.async_client.get(
+                TICKETS_URL, {"format": "csv"}, headers=headers
+            )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertTrue(res.is_async)
+            chunks = [chunk async for chunk in res.streaming_content]
+
+        # the header, then a chunk per batch of one ticket
+        self.assertEqual(len(chunks), 5)
+        self.assertTrue(chunks[0].startswith(b"id,reservation,"))
+        self.assertTrue(chunks[1].endswith(b",Alpha,TestDome,1,1\r\n"))
@@ -0,0 +1,138 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Reservation,
+    Ticket,
+    SeatHold,
+)
+
+HOLDS_URL = reverse("planetarium:seathold-list")
+CHECKOUT_URL = reverse("planetarium:seathold-checkout")
+BOOK_URL = reverse("planetarium:ticket-book")
+
+
+class SeatHoldApiTests(TestCase):
+    def setUp(self) -> None:
+        show = AstronomyShow.objects.create(
+            title="TestTitle", description="TestDescription"
+        )
+        dome = PlanetariumDome.objects.create(
+            name="TestName", rows=5, seats_in_row=10
+        )
+        self.session = ShowSession.objects.create(
+            astronomy_show=show, planetarium_dome=dome
+        )
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test2user@tests.test", password="testUser123"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@tests.test", password="testUser123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def payload(self, *seats):
+        return {
+            "show_session": self.session.id,
+            "seats": [{"row": row, "seat": seat} for row, seat in seats],
+        }
+
+    def hold(self, *seats):
+        return self.client.post(HOLDS_URL, self.payload(*seats), format="json")
+
+    def other_user_holds(self, row, seat, expires_in):
+        SeatHold.objects.create(
+            show_session=self.session,
+            user=self.other_user,
+            row=row,
+            seat=seat,
+            expires_at=timezone.now() + datetime.timedelta(minutes=expires_in),
+        )
+
+    def test_hold_and_checkout(self):
+        res = self.hold((1, 1), (1, 2))
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(self.client.get(HOLDS_URL).data["results"]), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                CHECKOUT_URL, {"show_session": self.session.id}, format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [(seat["row"], seat["seat"]) for seat in res.data["seats"]],
+            [(1, 1), (1, 2)],
+        )
+        self.assertFalse(SeatHold.objects.exists())
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.tickets_sold, 2)
+
+    def test_seat_held_by_other_user_conflicts(self):
+        self.other_user_holds(2, 2, expires_in=5)
+
+        res = self.hold((2, 1), (2, 2))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["seats"], [{"row": 2, "seat": 2}])
+        self.assertEqual(SeatHold.objects.count(), 1)
+
+    def test_held_seat_cannot_be_booked_by_other_user(self):
+        self.other_user_holds(2, 2, expires_in=5)
+
+        res = self.client.post(BOOK_URL, self.payload((2, 2)), format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_expired_hold_does_not_block(self):
+        self.other_user_holds(2, 2, expires_in=-1)
+
+        res = self.hold((2, 2))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.get().user, self.user)
+
+    def test_sold_seat_cannot_be_held(self):
+        Ticket.objects.create(
+            row=3,
+            seat=3,
+            show_session=self.session,
+            reservation=Reservation.objects.create(),
+        )
+
+        res = self.hold((3, 3))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+    def test_checkout_without_holds(self):
+        self.other_user_holds(2, 2, expires_in=-1)
+
+        res = self.client.post(
+            CHECKOUT_URL, {"show_session": self.session.id}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sweep_expired_holds(self):
+        self.other_user_holds(1, 1, expires_in=-1)
+        self.other_user_holds(1, 2, expires_in=5)
+
+        call_command("sweep_seat_holds", stdout=StringIO())
+
+        self.assertEqual(
+            list(SeatHold.objects.values_list("seat", flat=True)), [2]
+        )
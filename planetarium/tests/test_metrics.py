@@ -0,0 +1,90 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from planetarium.metrics import Histogram, registry
+from planetarium.models import ShowTheme
+
+THEMES_URL = reverse("planetarium:showtheme-list")
+METRICS_URL = reverse("metrics")
+
+
+class HistogramTests(TestCase):
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram("latency", "Latency", (1, 5))
+        for value in (0.5, 1, 3, 7):
+            histogram.observe((("view", "x"),), value)
+
+        self.assertEqual(
+            histogram.expose()[2:],
+            [
+                'latency_bucket{view="x",le="1"} 2',
+                'latency_bucket{view="x",le="5"} 3',
+                'latency_bucket{view="x",le="+Inf"} 4',
+                'latency_sum{view="x"} 11.5',
+                'latency_count{view="x"} 4',
+            ],
+        )
+
+
+class MetricsMiddlewareTests(TestCase):
+    def setUp(self) -> None:
+        caches["catalog"].clear()
+        registry.reset()
+        ShowTheme.objects.create(name="TestTheme")
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test2user@tests.test", password="testUser123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_header(self):
+        res = self.client.get(THEMES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        match = re.match(
+            r'db;dur=[\d.]+;desc="(\d+) queries", '
+            r"serialize;dur=[\d.]+, total;dur=[\d.]+$",
+            res.headers["Server-Timing"],
+        )
+        self.assertIsNotNone(match)
+        self.assertGreater(int(match[1]), 0)
+
+    def test_rendering_is_timed(self):
+        self.client.get(THEMES_URL)
+
+        labels = (("view", "ShowThemeViewSet"), ("action", "list"))
+        [(_, total, count)] = registry.serializer_duration.series.values()
+        self.assertEqual(
+            list(registry.serializer_duration.series)[0][:2], labels
+        )
+        self.assertEqual(count, 1)
+        self.assertGreater(total, 0)
+
+    def test_metrics_per_view_and_action(self):
+        self.client.get(THEMES_URL)
+        self.client.get(THEMES_URL)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        body = res.content.decode()
+        labels = 'view="ShowThemeViewSet",action="list",method="GET"'
+        self.assertIn(
+            f"planetarium_request_duration_seconds_count{{{labels}}} 2",
+            body,
+        )
+        self.assertIn(f"planetarium_request_queries_count{{{labels}}} 2", body)
+        self.assertIn(
+            f'planetarium_requests_total{{{labels},status="200"}} 2', body
+        )
+
+    def test_metrics_only_for_allowed_ips(self):
+        res = self.client.get(METRICS_URL, REMOTE_ADDR="10.0.0.1")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,114 @@
+import pstats
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from planetarium.models import ShowTheme
+from planetarium.profiling import ProfilingMiddleware
+
+THEMES_URL = reverse("planetarium:showtheme-list")
+PROFILED_MIDDLEWARE = [
+    "planetarium.profiling.ProfilingMiddleware",
+    *settings.MIDDLEWARE,
+]
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self) -> None:
+        caches["catalog"].clear()
+        ShowTheme.objects.create(name="TestTheme")
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test2user@tests.test", password="testUser123"
+        )
+        self.client.force_authenticate(self.user)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def profile(self, **overrides):
+        options = {
+            "MIDDLEWARE": PROFILED_MIDDLEWARE,
+            "PROFILE_SAMPLE_RATE": 1,
+            "PROFILE_SLOW_MS": 0,
+            "PROFILE_DIR": self.directory,
+            "PROFILE_KEEP": 10,
+            **overrides,
+        }
+        with override_settings(**options):
+            res = self.client.get(THEMES_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_sampled_request_is_saved(self):
+        self.profile()
+
+        [profile] = self.directory.glob("*.prof")
+        self.assertIn("_showtheme-list-GET-", profile.name)
+        self.assertIn(f"user{self.user.id}", profile.name)
+        stats = pstats.Stats(str(profile))
+        self.assertTrue(
+            any(filename.endswith("views.py") for filename, *_ in stats.stats)
+        )
+
+        folded = profile.with_suffix(".folded").read_text().splitlines()
+        for line in folded:
+            stack, samples = line.rsplit(" ", 1)
+            self.assertTrue(stack.startswith("handle_request ("))
+            self.assertGreater(int(samples), 0)
+
+    def test_slow_request_is_saved_without_stacks(self):
+        handle_request = ProfilingMiddleware.handle_request
+
+        def slow_request(middleware, get_response, request):
+            time.sleep(0.05)
+            return handle_request(middleware, get_response, request)
+
+        with mock.patch.object(
+            ProfilingMiddleware, "handle_request", slow_request
+        ):
+            self.profile(PROFILE_SAMPLE_RATE=0, PROFILE_SLOW_MS=20)
+
+        [profile] = self.directory.glob("*.prof")
+        self.assertFalse(profile.with_suffix(".folded").exists())
+
+    async def test_sync_views_are_profiled_under_asgi(self):
+        headers = {
+            "Authorization": f"Bearer {AccessToken.for_user(self.user)}"
+        }
+        with override_settings(
+            MIDDLEWARE=PROFILED_MIDDLEWARE,
+            PROFILE_SAMPLE_RATE=1,
+            PROFILE_SLOW_MS=0,
+            PROFILE_DIR=self.directory,
+            PROFILE_KEEP=10,
+        ):
+            res = await self.async_client.get(THEMES_URL, headers=headers)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        [profile] = self.directory.glob("*.prof")
+        stats = pstats.Stats(str(profile))
+        self.assertTrue(
+            any(filename.endswith("views.py") for filename, *_ in stats.stats)
+        )
+
+    def test_fast_request_is_not_saved(self):
+        self.profile(PROFILE_SAMPLE_RATE=0, PROFILE_SLOW_MS=60_000)
+
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    def test_old_profiles_are_rotated(self):
+        for _ in range(3):
+            self.profile(PROFILE_KEEP=2)
+
+        self.assertEqual(len(list(self.directory.glob("*.prof"))), 2)
+        self.assertEqual(len(list(self.directory.glob("*.folded"))), 2)
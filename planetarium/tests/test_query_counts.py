@@ -0,0 +1,114 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from planetarium.models import (
+    ShowTheme,
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Reservation,
+    Ticket,
+)
+
+ROW_COUNTS = (10, 100, 1000)
+
+
+class QueryCountTests(TestCase):
+    """List and detail endpoints must cost the same number of queries
+    whatever the number of rows in the database, one of them being the
+    conditional GET validators query"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test2user@tests.test", password="testUser123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def populate(self, count):
+        """Top up every table to `count` rows"""
+        missing = count - ShowTheme.objects.count()
+        start = timezone.now()
+        themes = ShowTheme.objects.bulk_create(
+            ShowTheme(name=f"theme {i}") for i in range(missing)
+        )
+        shows = AstronomyShow.objects.bulk_create(
+            AstronomyShow(title=f"show {i}", description="description")
+            for i in range(missing)
+        )
+        AstronomyShow.themes.through.objects.bulk_create(
+            AstronomyShow.themes.through(
+                astronomyshow_id=show.id, showtheme_id=theme.id
+            )
+            for show, theme in zip(shows, themes)
+        )
+        domes = PlanetariumDome.objects.bulk_create(
+            PlanetariumDome(name=f"dome {i}", rows=10, seats_in_row=20)
+            for i in range(missing)
+        )
+        sessions = ShowSession.objects.bulk_create(
+            ShowSession(
+                astronomy_show=show,
+                planetarium_dome=dome,
+                show_time=start + datetime.timedelta(hours=i),
+            )
+            for i, (show, dome) in enumerate(zip(shows, domes))
+        )
+        reservations = Reservation.objects.bulk_create(
+            Reservation(user=self.user) for _ in range(missing)
+        )
+        Ticket.objects.bulk_create(
+            Ticket(
+                row=1, seat=1, show_session=session, reservation=reservation
+            )
+            for session, reservation in zip(sessions, reservations)
+        )
+
+    def assertConstantQueries(self, url, num):
+        for count in ROW_COUNTS:
+            with self.subTest(rows=count):
+                self.populate(count)
+                caches["catalog"].clear()
+                with self.assertNumQueries(num):
+                    res = self.client.get(url)
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_theme_list(self):
+        self.assertConstantQueries(reverse("planetarium:showtheme-list"), 2)
+
+    def test_show_list(self):
+        self.assertConstantQueries(
+            reverse("planetarium:astronomyshow-list"), 3
+        )
+
+    def test_dome_list(self):
+        self.assertConstantQueries(
+            reverse("planetarium:planetariumdome-list"), 2
+        )
+
+    def test_session_list(self):
+        self.assertConstantQueries(reverse("planetarium:showsession-list"), 3)
+
+    def test_session_detail(self):
+        self.populate(1)
+        url = reverse(
+            "planetarium:showsession-detail",
+            args=[ShowSession.objects.first().id],
+        )
+        self.assertConstantQueries(url, 3)
+
+    def test_reservation_list(self):
+        self.assertConstantQueries(reverse("planetarium:reservation-list"), 3)
+
+    def test_ticket_list(self):
+        self.assertConstantQueries(reverse("planetarium:ticket-list"), 3)
+
+    def test_user_reservations(self):
+        self.assertConstantQueries(reverse("user:reservations"), 3)
@@ -0,0 +1,164 @@
+import datetime
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    SessionRecurrence,
+    ShowSession,
+)
+
+RECURRENCES_URL = reverse("planetarium:sessionrecurrence-list")
+# a Monday
+MONDAY = datetime.date(2099, 1, 5)
+
+
+def at(day, hour=19):
+    return datetime.datetime.combine(
+        day, datetime.time(hour), tzinfo=datetime.timezone.utc
+    )
+
+
+class SessionRecurrenceTests(TestCase):
+    def setUp(self) -> None:
+        self.dome = PlanetariumDome.objects.create(
+            name="TestDome", rows=2, seats_in_row=5
+        )
+        self.show = AstronomyShow.objects.create(
+            title="TestTitle", description="TestDescription"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="admin@tests.test", password="testUser123", is_staff=True
+            )
+        )
+        res = self.client.post(
+            RECURRENCES_URL,
+            {
+                "astronomy_show": self.show.id,
+                "planetarium_dome": self.dome.id,
+                # Tuesdays and Thursdays for two weeks
+                "weekdays": [1, 3],
+                "start_time": "19:00",
+                "starts_on": MONDAY,
+                "ends_on": MONDAY + datetime.timedelta(days=13),
+            },
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.recurrence = SessionRecurrence.objects.get(id=res.data["id"])
+        self.expand_url = reverse(
+            "planetarium:sessionrecurrence-expand", args=[self.recurrence.id]
+        )
+
+    def expand(self):
+        res = self.client.post(self.expand_url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data["created"]
+
+    def test_expand(self):
+        self.assertEqual(self.expand(), 4)
+
+        sessions = self.recurrence.sessions.order_by("show_time")
+        self.assertEqual(
+            [session.show_time for session in sessions],
+            [
+                at(MONDAY + datetime.timedelta(days=days))
+                for days in (1, 3, 8, 10)
+            ],
+        )
+        self.assertEqual(sessions[0].end_time, at(sessions[0].show_time, 20))
+        self.assertEqual(
+            {
+                (session.astronomy_show, session.planetarium_dome)
+                for session in sessions
+            },
+            {(self.show, self.dome)},
+        )
+
+    def test_expanding_again_adds_only_missing_sessions(self):
+        self.expand()
+        self.assertEqual(self.expand(), 0)
+
+        self.recurrence.sessions.order_by("show_time").first().delete()
+        self.recurrence.ends_on += datetime.timedelta(days=7)
+        self.recurrence.save()
+
+        # the deleted session and the two of the third week, reading the
+        # recurrence, its sessions and the dome's ones once
+        with self.assertNumQueries(9):
+            self.assertEqual(self.expand(), 3)
+        self.assertEqual(self.recurrence.sessions.count(), 6)
+
+    def test_overlapping_occurrences_create_nothing(self):
+        session = ShowSession.objects.create(
+            astronomy_show=self.show,
+            planetarium_dome=self.dome,
+            show_time=at(MONDAY + datetime.timedelta(days=3), 18)
+            + datetime.timedelta(minutes=30),
+        )
+
+        res = self.client.post(self.expand_url)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["occurrences"],
+            {
+                at(MONDAY + datetime.timedelta(days=3)).isoformat(): [
+                    f"Overlaps session {session.id} in the same dome."
+                ]
+            },
+        )
+        self.assertFalse(self.recurrence.sessions.exists())
+
+    def test_validation(self):
+        for invalid in (
+            {"weekdays": [7]},
+            {"weekdays": []},
+            {"ends_on": MONDAY - datetime.timedelta(days=1)},
+        ):
+            res = self.client.patch(
+                reverse(
+                    "planetarium:sessionrecurrence-detail",
+                    args=[self.recurrence.id],
+                ),
+                invalid,
+                format="json",
+            )
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_staff_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test2user@tests.test", password="testUser123"
+            )
+        )
+
+        res = self.client.post(self.expand_url)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_command(self):
+        SessionRecurrence.objects.create(
+            astronomy_show=self.show,
+            planetarium_dome=self.dome,
+            weekdays=[0],
+            start_time=datetime.time(19),
+            starts_on=datetime.date(2000, 1, 1),
+            ends_on=datetime.date(2000, 12, 31),
+        )
+        out = io.StringIO()
+
+        call_command("expand_recurrences", stdout=out)
+        call_command("expand_recurrences", stdout=out)
+
+        # the recurrence of 2000 is over
+        self.assertEqual(ShowSession.objects.count(), 4)
+        self.assertIn("Created 0 session(s)", out.getvalue())
@@ -0,0 +1,187 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    ShowTheme,
+)
+from planetarium_service.db.replicas import (
+    PIN_COOKIE,
+    ReplicaMiddleware,
+    ReplicaRouter,
+    read_database,
+    use_primary,
+)
+
+BOOK_URL = reverse("planetarium:ticket-book")
+TICKETS_URL = reverse("planetarium:ticket-list")
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.router = ReplicaRouter()
+
+    def test_reads_outside_requests_use_the_primary(self):
+        self.assertEqual(self.router.db_for_read(ShowTheme), DEFAULT_DB_ALIAS)
+
+    def test_reads_use_the_replica_of_the_request(self):
+        token = read_database.set("replica1")
+        self.addCleanup(read_database.reset, token)
+
+        self.assertEqual(self.router.db_for_read(ShowTheme), "replica1")
+        with use_primary():
+            self.assertEqual(
+                self.router.db_for_read(ShowTheme), DEFAULT_DB_ALIAS
+            )
+        self.assertEqual(self.router.db_for_write(ShowTheme), DEFAULT_DB_ALIAS)
+
+    def test_only_the_primary_is_migrated(self):
+        self.assertTrue(self.router.allow_migrate(DEFAULT_DB_ALIAS, "x"))
+        self.assertFalse(self.router.allow_migrate("replica1", "x"))
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class ReplicaMiddlewareTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        caches["dome_shape"].clear()
+        self.factory = RequestFactory()
+        self.user = get_user_model().objects.create_user(
+            email="test2user@tests.test", password="testUser123"
+        )
+        self.token = str(AccessToken.for_user(self.user))
+        self.status = status.HTTP_200_OK
+        self.middleware = ReplicaMiddleware(self.get_response)
+
+    def get_response(self, request):
+        self.database = read_database.get()
+        return HttpResponse(status=self.status)
+
+    def send(self, method, user=None, **extra):
+        request = getattr(self.factory, method)("/api/ticket/", **extra)
+        if user is not None:
+            request.user = user
+        return self.middleware(request)
+
+    def test_safe_requests_read_from_a_replica(self):
+        response = self.send("get")
+
+        self.assertEqual(self.database, "replica1")
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_writes_read_from_the_primary_and_pin_the_client(self):
+        response = self.send("post", user=self.user)
+
+        self.assertIsNone(self.database)
+        self.assertEqual(
+            response.cookies[PIN_COOKIE]["max-age"],
+            settings.REPLICA_PIN_SECONDS,
+        )
+
+        self.factory.cookies[PIN_COOKIE] = "1"
+        self.send("get")
+        self.assertIsNone(self.database)
+
+    def test_token_users_are_pinned_without_the_cookie(self):
+        self.send("post", user=self.user)
+
+        self.send("get", HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        self.assertIsNone(self.database)
+
+        other = get_user_model().objects.create_user(
+            email="other@tests.test", password="testUser123"
+        )
+        self.send(
+            "get", HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(other)}"
+        )
+        self.assertEqual(self.database, "replica1")
+
+    def test_failed_writes_do_not_pin(self):
+        self.status = status.HTTP_400_BAD_REQUEST
+        response = self.send("post", user=self.user)
+
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        self.status = status.HTTP_200_OK
+        self.send("get", HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        self.assertEqual(self.database, "replica1")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        self.send("get")
+
+        self.assertIsNone(self.database)
+
+
+@skipUnless(settings.DATABASE_REPLICAS, "DB_REPLICAS is not set")
+class ReplicaRoutingTests(TransactionTestCase):
+    """Run with DB_REPLICAS set, e.g. DB_REPLICAS=/planetarium_replica"""
+
+    databases = "__all__"
+
+    def setUp(self) -> None:
+        cache.clear()
+        caches["dome_shape"].clear()
+        self.replica = connections[settings.DATABASE_REPLICAS[0]]
+        show = AstronomyShow.objects.create(
+            title="TestTitle", description="TestDescription"
+        )
+        dome = PlanetariumDome.objects.create(
+            name="TestName", rows=5, seats_in_row=10
+        )
+        self.session = ShowSession.objects.create(
+            astronomy_show=show,
+            planetarium_dome=dome,
+            show_time=timezone.now(),
+        )
+        user = get_user_model().objects.create_user(
+            email="test2user@tests.test", password="testUser123"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+
+    def test_reads_follow_writes_of_the_user(self):
+        with CaptureQueriesContext(self.replica) as queries:
+            res = self.client.get(TICKETS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(queries.captured_queries)
+
+        with CaptureQueriesContext(self.replica) as queries:
+            res = self.client.post(
+                BOOK_URL,
+                {
+                    "show_session": self.session.id,
+                    "seats": [{"row": 1, "seat": 1}],
+                },
+                format="json",
+            )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(queries.captured_queries)
+
+        # pinned by user id, as token clients may not keep cookies
+        self.client.cookies.clear()
+        with CaptureQueriesContext(self.replica) as queries:
+            res = self.client.get(TICKETS_URL)
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertFalse(queries.captured_queries)
@@ -0,0 +1,178 @@
+import datetime
+import io
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from planetarium.models import AstronomyShow, PlanetariumDome, ShowSession
+
+IMPORT_URL = reverse("planetarium:showsession-import")
+START = datetime.datetime(2024, 1, 1, 18, tzinfo=datetime.timezone.utc)
+
+
+class ScheduleImportTests(TestCase):
+    def setUp(self) -> None:
+        self.dome = PlanetariumDome.objects.create(
+            name="TestDome", rows=2, seats_in_row=5
+        )
+        self.show = AstronomyShow.objects.create(
+            title="TestTitle", description="TestDescription"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="admin@tests.test", password="testUser123", is_staff=True
+            )
+        )
+
+    def row(self, hours, **values):
+        return {
+            "astronomy_show": self.show.id,
+            "planetarium_dome": "TestDome",
+            "show_time": (START + datetime.timedelta(hours=hours)).isoformat(),
+            **values,
+        }
+
+    def test_import_json(self):
+        rows = [self.row(hours) for hours in range(0, 200, 2)]
+
+        # two lookups, the overlap check and one insert in a savepoint
+        with self.assertNumQueries(6):
+            res = self.client.post(IMPORT_URL, rows, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data, {"sessions": 100, "created": True})
+        self.assertEqual(
+            ShowSession.objects.filter(
+                astronomy_show=self.show, planetarium_dome=self.dome
+            ).count(),
+            100,
+        )
+
+    def test_import_csv(self):
+        upload = SimpleUploadedFile(
+            "schedule.csv",
+            b"astronomy_show,planetarium_dome,show_time\n"
+            b"TestTitle,TestDome,2024-01-01T18:00:00Z\n"
+            b"TestTitle,TestDome,2024-01-01 20:00\n",
+        )
+
+        res = self.client.post(IMPORT_URL, {"file": upload})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            list(
+                ShowSession.objects.order_by("show_time").values_list(
+                    "show_time", flat=True
+                )
+            ),
+            [START, START + datetime.timedelta(hours=2)],
+        )
+
+    def test_row_errors(self):
+        AstronomyShow.objects.create(
+            title="TestTitle", description="TestDescription"
+        )
+        rows = [
+            self.row(0),
+            self.row(2, astronomy_show="TestTitle"),
+            self.row(4, planetarium_dome="Unknown"),
+            self.row(6, show_time="tomorrow"),
+            {"astronomy_show": self.show.id},
+            "TestTitle",
+        ]
+
+        res = self.client.post(IMPORT_URL, rows, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(sorted(res.data["rows"]), [2, 3, 4, 5, 6])
+        self.assertIn("use its id", res.data["rows"][2]["astronomy_show"][0])
+        self.assertEqual(
+            res.data["rows"][3]["planetarium_dome"], ["Unknown dome Unknown."]
+        )
+        self.assertIn("show_time", res.data["rows"][4])
+        self.assertEqual(
+            sorted(res.data["rows"][5]), ["planetarium_dome", "show_time"]
+        )
+        self.assertIn("non_field_errors", res.data["rows"][6])
+        self.assertFalse(ShowSession.objects.exists())
+
+    def test_overlaps(self):
+        session = ShowSession.objects.create(
+            astronomy_show=self.show,
+            planetarium_dome=self.dome,
+            show_time=START,
+        )
+        other_dome = PlanetariumDome.objects.create(
+            name="OtherDome", rows=2, seats_in_row=5
+        )
+        rows = [
+            self.row(0.5),
+            self.row(3),
+            self.row(3.5),
+            self.row(0, planetarium_dome=other_dome.id),
+            self.row(1.25),
+        ]
+
+        res = self.client.post(IMPORT_URL, rows, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["rows"],
+            {
+                1: {
+                    "show_time": [
+                        f"Overlaps session {session.id} in the same dome.",
+                        "Overlaps row 5 in the same dome.",
+                    ]
+                },
+                2: {"show_time": ["Overlaps row 3 in the same dome."]},
+                3: {"show_time": ["Overlaps row 2 in the same dome."]},
+                5: {"show_time": ["Overlaps row 1 in the same dome."]},
+            },
+        )
+        self.assertEqual(ShowSession.objects.count(), 1)
+
+    def test_dry_run(self):
+        res = self.client.post(
+            f"{IMPORT_URL}?dry_run=true", [self.row(0)], format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"sessions": 1, "created": False})
+        self.assertFalse(ShowSession.objects.exists())
+
+    def test_staff_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test2user@tests.test", password="testUser123"
+            )
+        )
+
+        res = self.client.post(IMPORT_URL, [self.row(0)], format="json")
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile(suffix=".json") as file:
+            file.write(
+                b'[{"astronomy_show": "TestTitle", '
+                b'"planetarium_dome": "TestDome", '
+                b'"show_time": "2024-01-01T18:00:00Z"}]'
+            )
+            file.flush()
+
+            call_command("import_schedule", file.name, stdout=io.StringIO())
+            self.assertEqual(ShowSession.objects.count(), 1)
+
+            # the session is now taken
+            stderr = io.StringIO()
+            with self.assertRaises(CommandError):
+                call_command("import_schedule", file.name, stderr=stderr)
+            self.assertIn("Row 1, show_time: Overlaps", stderr.getvalue())
+        self.assertEqual(ShowSession.objects.count(), 1)
@@ -0,0 +1,110 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from planetarium.exceptions import SessionsOverlap
+from planetarium.models import AstronomyShow, PlanetariumDome, ShowSession
+
+SESSIONS_URL = reverse("planetarium:showsession-list")
+START = datetime.datetime(2024, 1, 1, 18, tzinfo=datetime.timezone.utc)
+
+
+class SessionOverlapTests(TestCase):
+    def setUp(self) -> None:
+        self.dome = PlanetariumDome.objects.create(
+            name="TestDome", rows=2, seats_in_row=5
+        )
+        self.show = AstronomyShow.objects.create(
+            title="TestTitle",
+            description="TestDescription",
+            duration=datetime.timedelta(minutes=90),
+        )
+        self.session = ShowSession.objects.create(
+            astronomy_show=self.show,
+            planetarium_dome=self.dome,
+            show_time=START,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="admin@tests.test", password="testUser123", is_staff=True
+            )
+        )
+
+    def create_session(self, minutes, dome=None):
+        return self.client.post(
+            SESSIONS_URL,
+            {
+                "astronomy_show": self.show.id,
+                "planetarium_dome": (dome or self.dome).id,
+                "show_time": START + datetime.timedelta(minutes=minutes),
+            },
+        )
+
+    def test_end_time_follows_the_show(self):
+        self.assertEqual(
+            self.session.end_time, START + datetime.timedelta(minutes=90)
+        )
+
+        self.show.duration = datetime.timedelta(minutes=30)
+        self.show.save()
+        self.session.refresh_from_db()
+        self.assertEqual(
+            self.session.end_time, START + datetime.timedelta(minutes=30)
+        )
+
+    def test_overlapping_sessions_conflict(self):
+        res = self.create_session(60)
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["detail"].code, SessionsOverlap.default_code)
+
+        other_dome = PlanetariumDome.objects.create(
+            name="OtherDome", rows=2, seats_in_row=5
+        )
+        res = self.create_session(60, dome=other_dome)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        # back to back
+        res = self.create_session(90)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            res.data["end_time"],
+            (START + datetime.timedelta(minutes=180))
+            .isoformat()
+            .replace("+00:00", "Z"),
+        )
+
+    def test_moving_into_a_session_conflicts(self):
+        later = self.create_session(120).data["id"]
+
+        res = self.client.patch(
+            reverse("planetarium:showsession-detail", args=[later]),
+            {"show_time": START + datetime.timedelta(minutes=30)},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+    def test_lengthening_a_show_into_a_session_conflicts(self):
+        self.create_session(120)
+
+        res = self.client.patch(
+            reverse("planetarium:astronomyshow-detail", args=[self.show.id]),
+            {"duration": "03:00:00"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.show.refresh_from_db()
+        self.assertEqual(self.show.duration, datetime.timedelta(minutes=90))
+
+    def test_unscheduled_sessions_never_conflict(self):
+        for _ in range(2):
+            ShowSession.objects.create(
+                astronomy_show=self.show, planetarium_dome=self.dome
+            )
+
+        self.assertEqual(ShowSession.objects.count(), 3)
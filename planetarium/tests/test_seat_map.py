@@ -0,0 +1,121 @@
+import base64
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Reservation,
+    Ticket,
+)
+from planetarium.seat_map import (
+    cache_seat_map,
+    get_cached_seat_map,
+    get_seat_map_cache,
+)
+
+
+def seats_url(session_id):
+    return reverse("planetarium:showsession-seats", args=[session_id])
+
+
+class SeatMapApiTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        caches["dome_shape"].clear()
+        get_seat_map_cache().clear()
+        show = AstronomyShow.objects.create(
+            title="TestTitle", description="TestDescription"
+        )
+        dome = PlanetariumDome.objects.create(
+            name="TestName", rows=3, seats_in_row=5
+        )
+        self.session = ShowSession.objects.create(
+            astronomy_show=show, planetarium_dome=dome
+        )
+        self.reservation = Reservation.objects.create()
+        for row, seat in ((1, 1), (2, 5), (3, 4)):
+            Ticket.objects.create(
+                row=row,
+                seat=seat,
+                show_session=self.session,
+                reservation=self.reservation,
+            )
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test2user@tests.test", password="testUser123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_bitmap(self):
+        res = self.client.get(seats_url(self.session.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["rows"], 3)
+        self.assertEqual(res.data["seats_in_row"], 5)
+        # bits 0, 9 and 13 of 15 are set
+        self.assertEqual(
+            base64.b64decode(res.data["bitmap"]),
+            bytes([0b10000000, 0b01000100]),
+        )
+
+    def test_json_fallback(self):
+        res = self.client.get(seats_url(self.session.id), {"encoding": "json"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["taken"], [[1, 1], [2, 5], [3, 4]])
+
+    def test_cached_until_ticket_is_created(self):
+        self.client.get(seats_url(self.session.id))
+        with self.assertNumQueries(0):
+            self.client.get(seats_url(self.session.id))
+
+        Ticket.objects.create(
+            row=3,
+            seat=5,
+            show_session=self.session,
+            reservation=self.reservation,
+        )
+        res = self.client.get(seats_url(self.session.id), {"encoding": "json"})
+        self.assertIn([3, 5], res.data["taken"])
+
+    def test_padded_ids_share_the_cached_map(self):
+        self.client.get(seats_url(f"0{self.session.id}"))
+
+        self.assertIsNotNone(get_cached_seat_map(self.session.id))
+        Ticket.objects.create(
+            row=3,
+            seat=5,
+            show_session=self.session,
+            reservation=self.reservation,
+        )
+        res = self.client.get(
+            seats_url(f"0{self.session.id}"), {"encoding": "json"}
+        )
+        self.assertIn([3, 5], res.data["taken"])
+
+    def test_invalid_id(self):
+        res = self.client.get(seats_url("x"))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_maps_rebuilt_before_commit_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                row=3,
+                seat=5,
+                show_session=self.session,
+                reservation=self.reservation,
+            )
+            # as by a request that read the tickets before the commit
+            cache_seat_map(self.session)
+
+        self.assertIsNone(get_cached_seat_map(self.session.id))
+
+    def test_unknown_session(self):
+        res = self.client.get(seats_url(self.session.id + 1))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
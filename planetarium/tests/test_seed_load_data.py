@@ -0,0 +1,48 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Reservation,
+    Ticket,
+)
+
+
+class SeedLoadDataTests(TestCase):
+    def test_seed_load_data(self):
+        call_command(
+            "seed_load_data",
+            "--domes=2",
+            "--themes=3",
+            "--shows=3",
+            "--days=2",
+            "--sessions-per-day=2",
+            "--users=3",
+            "--reservations=20",
+            "--batch-size=7",
+            "--seed=1",
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(PlanetariumDome.objects.count(), 2)
+        self.assertEqual(AstronomyShow.objects.count(), 3)
+        self.assertEqual(ShowSession.objects.count(), 4)
+        self.assertEqual(get_user_model().objects.count(), 3)
+        self.assertEqual(Reservation.objects.count(), 20)
+        self.assertFalse(
+            AstronomyShow.objects.filter(search_vector=None).exists()
+        )
+        for session in ShowSession.objects.annotate(count=Count("tickets")):
+            self.assertEqual(session.tickets_sold, session.count)
+        self.assertEqual(
+            Ticket.objects.values("show_session", "row", "seat")
+            .distinct()
+            .count(),
+            Ticket.objects.count(),
+        )
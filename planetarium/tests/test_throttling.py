@@ -0,0 +1,91 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+
+from planetarium.throttling import THROTTLE_CACHE, UserRateThrottle
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FiveAMinuteThrottle(UserRateThrottle):
+    rate = "5/min"
+
+
+class SlidingWindowThrottleTests(TestCase):
+    def setUp(self) -> None:
+        self.cache = caches[THROTTLE_CACHE]
+        self.cache.clear()
+        self.clock = Clock(60 * 1000)
+        request = RequestFactory().get("/")
+        request.user = get_user_model().objects.create_user(
+            email="test2user@tests.test", password="testUser123"
+        )
+        self.request = request
+
+    def allow(self):
+        throttle = FiveAMinuteThrottle()
+        throttle.timer = self.clock
+        return throttle.allow_request(self.request, None), throttle
+
+    def test_rate_is_enforced_with_one_counter(self):
+        self.assertTrue(all(self.allow()[0] for _ in range(5)))
+
+        allowed, throttle = self.allow()
+        self.assertFalse(allowed)
+        self.assertEqual(self.cache.get(f"{throttle.key}:1000"), 5)
+        # the next window needs 1/5 of this one out of the way
+        self.assertAlmostEqual(throttle.wait(), 72.0)
+
+    def test_previous_window_counts_by_overlap(self):
+        for _ in range(4):
+            self.allow()
+
+        # 4 * 3/4 of the last window + 1 + 1 new requests fit
+        self.clock.now += 75
+        self.assertTrue(self.allow()[0])
+        self.assertTrue(self.allow()[0])
+        allowed, throttle = self.allow()
+        self.assertFalse(allowed)
+        # 4 * 1/2 of the last window leaves room for a third request
+        self.assertAlmostEqual(throttle.wait(), 15.0)
+
+        self.clock.now += 15
+        self.assertTrue(self.allow()[0])
+
+
+class ThrottleApiTests(TestCase):
+    def setUp(self) -> None:
+        caches[THROTTLE_CACHE].clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test2user@tests.test", password="testUser123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_throttled_response(self):
+        url = reverse("planetarium:showtheme-list")
+        with mock.patch.object(
+            SimpleRateThrottle,
+            "THROTTLE_RATES",
+            {"anon": "2/hour", "user": "2/hour"},
+        ):
+            for _ in range(2):
+                self.assertEqual(
+                    self.client.get(url).status_code, status.HTTP_200_OK
+                )
+            res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res.headers)
@@ -0,0 +1,100 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from planetarium.models import (
+    ShowTheme,
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Reservation,
+    Ticket,
+)
+
+RESERVATIONS_URL = reverse("user:reservations")
+
+
+class UserReservationApiTests(TestCase):
+    def setUp(self) -> None:
+        show = AstronomyShow.objects.create(
+            title="TestTitle", description="TestDescription"
+        )
+        show.themes.add(ShowTheme.objects.create(name="TestTheme"))
+        dome = PlanetariumDome.objects.create(
+            name="TestName", rows=5, seats_in_row=10
+        )
+        self.session = ShowSession.objects.create(
+            astronomy_show=show,
+            planetarium_dome=dome,
+            show_time=timezone.now(),
+        )
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test2user@tests.test", password="testUser123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def reserve(self, user, *seats, days_ago=0):
+        reservation = Reservation.objects.create(user=user)
+        Reservation.objects.filter(id=reservation.id).update(
+            created_at=timezone.now() - datetime.timedelta(days=days_ago)
+        )
+        for row, seat in seats:
+            Ticket.objects.create(
+                row=row,
+                seat=seat,
+                show_session=self.session,
+                reservation=reservation,
+            )
+        return reservation
+
+    def test_lists_own_reservations_newest_first(self):
+        older = self.reserve(self.user, (1, 2), (1, 1), days_ago=2)
+        newer = self.reserve(self.user, (3, 3))
+        other = get_user_model().objects.create_user(
+            email="other@tests.test", password="testUser123"
+        )
+        self.reserve(other, (2, 2))
+
+        res = self.client.get(RESERVATIONS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [reservation["id"] for reservation in res.data["results"]],
+            [newer.id, older.id],
+        )
+        tickets = res.data["results"][1]["tickets"]
+        self.assertEqual(
+            [(ticket["row"], ticket["seat"]) for ticket in tickets],
+            [(1, 1), (1, 2)],
+        )
+        self.assertEqual(
+            tickets[0]["show_session"]["astronomy_show"],
+            {"title": "TestTitle", "themes": "TestTheme"},
+        )
+        self.assertEqual(
+            tickets[0]["show_session"]["planetarium_dome"],
+            {"name": "TestName", "capacity": 50},
+        )
+
+    def test_pages_by_cursor(self):
+        for days_ago in range(3):
+            self.reserve(self.user, (1, days_ago + 1), days_ago=days_ago)
+
+        res = self.client.get(RESERVATIONS_URL, {"page_size": 2})
+        self.assertEqual(len(res.data["results"]), 2)
+
+        res = self.client.get(res.data["next"])
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertIsNone(res.data["next"])
+
+    def test_auth_required(self):
+        res = APIClient().get(RESERVATIONS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
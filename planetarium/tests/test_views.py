@@ -1,5 +1,10 @@
+import datetime
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
@@ -130,7 +135,9 @@ class CustomLogicApiTests(TestCase):
             seats_in_row=10,
         )
         self.session = ShowSession.objects.create(
-            astronomy_show=self.show, planetarium_dome=self.dome
+            astronomy_show=self.show,
+            planetarium_dome=self.dome,
+            show_time=timezone.now(),
         )
 
         self.serializer = ShowSessionListSerializer(self.session)
@@ -146,17 +153,21 @@ class CustomLogicApiTests(TestCase):
 
     def test_tickets_available_calculation(self):
         reservation = Reservation.objects.create()
-        Ticket.objects.create(
-            row=1,
-            seat=1,
-            show_session=self.session,
-            reservation=reservation,
-        )
-        Ticket.objects.create(
-            row=1, seat=2, show_session=self.session, reservation=reservation
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                row=1,
+                seat=1,
+                show_session=self.session,
+                reservation=reservation,
+            )
+            Ticket.objects.create(
+                row=1,
+                seat=2,
+                show_session=self.session,
+                reservation=reservation,
+            )
         request = self.client.get(SESSIONS_URL)
-        queryset = request.data
+        queryset = request.data["results"]
 
         tickets_available = queryset[0]["tickets_available"]
         expected_tickets_available = 5 * 10 - 2
@@ -165,6 +176,41 @@ class CustomLogicApiTests(TestCase):
             expected_tickets_available,
         )
 
+    def test_reservation_cancellation_releases_tickets(self):
+        reservation = Reservation.objects.create()
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                row=1,
+                seat=1,
+                show_session=self.session,
+                reservation=reservation,
+            )
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.tickets_sold, 1)
+
+        url = reverse("planetarium:reservation-detail", args=[reservation.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.delete(url)
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.tickets_sold, 0)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_reconcile_tickets_sold(self):
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            show_session=self.session,
+            reservation=self.reservation,
+        )
+        ShowSession.objects.update(tickets_sold=7)
+
+        call_command("reconcile_tickets_sold", stdout=StringIO())
+
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.tickets_sold, 1)
+
     def test_ticket_out_of_border(self):
         with self.assertRaises(ValidationError):
             Ticket.objects.create(
@@ -197,3 +243,99 @@ class CustomLogicApiTests(TestCase):
                 show_session=self.session,
                 reservation=self.reservation,
             )
+
+
+class ShowSessionListTests(TestCase):
+    def setUp(self) -> None:
+        self.show = AstronomyShow.objects.create(
+            title="TestTitle", description="TestDescription"
+        )
+        self.other_show = AstronomyShow.objects.create(
+            title="OtherTitle", description="TestDescription"
+        )
+        self.dome = PlanetariumDome.objects.create(
+            name="TestName", rows=5, seats_in_row=10
+        )
+        self.start = datetime.datetime(
+            2024, 1, 1, 19, tzinfo=datetime.timezone.utc
+        )
+        for day in range(5):
+            ShowSession.objects.create(
+                astronomy_show=self.other_show if day == 4 else self.show,
+                planetarium_dome=self.dome,
+                show_time=self.start + datetime.timedelta(days=day),
+            )
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test2user@tests.test", password="testUser123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def show_times(self, res):
+        return [session["show_time"][:10] for session in res.data["results"]]
+
+    def test_cursor_pagination(self):
+        res = self.client.get(SESSIONS_URL, {"page_size": 2})
+        self.assertEqual(self.show_times(res), ["2024-01-01", "2024-01-02"])
+
+        res = self.client.get(res.data["next"])
+        self.assertEqual(self.show_times(res), ["2024-01-03", "2024-01-04"])
+
+    def test_filter_by_date_range(self):
+        res = self.client.get(
+            SESSIONS_URL, {"date_from": "2024-01-02", "date_to": "2024-01-03"}
+        )
+        self.assertEqual(self.show_times(res), ["2024-01-02", "2024-01-03"])
+
+    def test_filter_by_show_and_dome(self):
+        res = self.client.get(
+            SESSIONS_URL, {"show": self.other_show.id, "dome": self.dome.id}
+        )
+        self.assertEqual(self.show_times(res), ["2024-01-05"])
+
+    def test_invalid_date(self):
+        res = self.client.get(SESSIONS_URL, {"date_from": "tomorrow"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AstronomyShowSearchTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test2user@tests.test", password="testUser123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_search_ranks_title_matches_first(self):
+        AstronomyShow.objects.create(
+            title="Planets", description="Our way to the black holes"
+        )
+        AstronomyShow.objects.create(
+            title="Black Holes", description="What happens at the horizon"
+        )
+        AstronomyShow.objects.create(
+            title="Moon", description="Craters and seas"
+        )
+
+        res = self.client.get(
+            reverse("planetarium:astronomyshow-list"), {"q": "black hole"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [show["title"] for show in res.data], ["Black Holes", "Planets"]
+        )
+
+    def test_search_follows_updates(self):
+        show = AstronomyShow.objects.create(
+            title="Moon", description="Craters and seas"
+        )
+        show.title = "Mars"
+        show.save()
+
+        res = self.client.get(
+            reverse("planetarium:astronomyshow-list"), {"q": "mars"}
+        )
+
+        self.assertEqual([show["title"] for show in res.data], ["Mars"])
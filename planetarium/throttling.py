@@ -0,0 +1,68 @@
+from django.core.cache import caches
+from rest_framework import throttling
+
+THROTTLE_CACHE = "throttle"
+
+
+class SlidingWindowMixin:
+    """
+    Sliding window counter: one request counter per client and window of
+    the rate's duration, incremented atomically in the throttle cache.
+    The previous window counts in proportion to its overlap with the
+    sliding window, so the state of a client is two integers whatever
+    its rate, instead of a timestamp per request.
+    """
+
+    @property
+    def cache(self):
+        return caches[THROTTLE_CACHE]
+
+    def increment(self, key):
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # the previous window is read for a whole window after this one
+            if self.cache.add(key, 1, self.duration * 2):
+                return 1
+            return self.cache.incr(key)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        window, elapsed = divmod(self.timer(), self.duration)
+        window_key = f"{self.key}:{window:.0f}"
+        self.count = self.increment(window_key)
+        self.previous = self.cache.get(f"{self.key}:{window - 1:.0f}", 0)
+        self.elapsed = elapsed / self.duration
+        if self.previous * (1 - self.elapsed) + self.count > self.num_requests:
+            # rejected requests do not count
+            self.cache.decr(window_key)
+            self.count -= 1
+            return self.throttle_failure()
+        return True
+
+    def wait(self):
+        """Seconds until the weighted count leaves room for a request"""
+        room = self.num_requests - self.count - 1
+        if room >= 0 and self.previous:
+            # the share of the previous window shrinks as the window slides
+            fraction = 1 - room / self.previous - self.elapsed
+            return max(fraction, 0) * self.duration
+        # in the next window, this one becomes the previous
+        fraction = (
+            1 - (self.num_requests - 1) / self.count if self.count else 0
+        )
+        return (1 - self.elapsed + max(fraction, 0)) * self.duration
+
+
+class AnonRateThrottle(SlidingWindowMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(SlidingWindowMixin, throttling.UserRateThrottle):
+    pass
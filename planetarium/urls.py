@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework import routers
 
+from planetarium import async_views
 from planetarium.views import (
     ShowThemeViewSet,
     AstronomyShowViewSet,
@@ -8,6 +9,10 @@ from planetarium.views import (
     ShowSessionViewSet,
     ReservationViewSet,
     TicketViewSet,
+    SeatHoldViewSet,
+    SessionRecurrenceViewSet,
+    OccupancyReportViewSet,
+    ExportViewSet,
 )
 
 router = routers.DefaultRouter()
@@ -17,7 +22,36 @@ router.register("dome", PlanetariumDomeViewSet)
 router.register("session", ShowSessionViewSet)
 router.register("reservation", ReservationViewSet)
 router.register("ticket", TicketViewSet)
+router.register("hold", SeatHoldViewSet)
+router.register("recurrence", SessionRecurrenceViewSet)
+router.register(
+    "analytics/occupancy", OccupancyReportViewSet, basename="occupancy"
+)
+router.register("export", ExportViewSet, basename="export")
+
+async_urlpatterns = [
+    path("theme/", async_views.theme_list, name="theme-list"),
+    path("theme/<int:pk>/", async_views.theme_detail, name="theme-detail"),
+    path("show/", async_views.show_list, name="show-list"),
+    path("show/<int:pk>/", async_views.show_detail, name="show-detail"),
+    path("dome/", async_views.dome_list, name="dome-list"),
+    path("dome/<int:pk>/", async_views.dome_detail, name="dome-detail"),
+    path("session/", async_views.session_list, name="session-list"),
+    path(
+        "session/<int:pk>/",
+        async_views.session_detail,
+        name="session-detail",
+    ),
+    path(
+        "session/<int:pk>/seats/",
+        async_views.session_seats,
+        name="session-seats",
+    ),
+]
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("", include(router.urls)),
+    path("async/", include((async_urlpatterns, "async"))),
+]
 
 app_name = "planetarium"
@@ -1,15 +1,34 @@
 import datetime
+import hashlib
 
 from django.contrib.auth.models import AnonymousUser
-from django.db import transaction
-from django.db.models import F, Count
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction, IntegrityError
+from django.db.models import Count, DateField, F, Prefetch, Sum
+from django.db.models.functions import TruncDate, TruncWeek
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import mixins
-from rest_framework.exceptions import ValidationError
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import generics, mixins, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination, CursorPagination
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet, GenericViewSet
 
+from planetarium.catalog_cache import CatalogCacheMixin
+from planetarium.conditional import ConditionalGetMixin
+from planetarium.exceptions import SeatsTaken
+from planetarium.exports import (
+    CSVRenderer,
+    NDJSONRenderer,
+    astream_export,
+    stream_export,
+)
+from planetarium.holds import claim_seats
 from planetarium.models import (
     ShowTheme,
     AstronomyShow,
@@ -17,6 +36,20 @@ from planetarium.models import (
     ShowSession,
     Reservation,
     Ticket,
+    SeatHold,
+    SessionOccupancy,
+    SessionRecurrence,
+)
+from planetarium.schedule import (
+    expand_recurrence,
+    import_schedule,
+    read_schedule,
+)
+from planetarium.seat_map import (
+    get_cached_seat_map,
+    cache_seat_map,
+    encode_bitmap,
+    unpack_bitmap,
 )
 from planetarium.serializers import (
     ShowThemeSerializer,
@@ -28,12 +61,19 @@ from planetarium.serializers import (
     ShowSessionDetailSerializer,
     ShowSessionEditSerializer,
     TicketEditSerializer,
+    TicketBatchSerializer,
+    SeatHoldSerializer,
+    SeatHoldBatchSerializer,
+    SeatHoldCheckoutSerializer,
+    UserReservationSerializer,
+    SessionRecurrenceSerializer,
 )
 
 
-class ShowThemeViewSet(ModelViewSet):
+class ShowThemeViewSet(CatalogCacheMixin, ModelViewSet):
     queryset = ShowTheme.objects.all()
     serializer_class = ShowThemeSerializer
+    cache_models = (ShowTheme,)
 
     @staticmethod
     def _params_to_ints(qs):
@@ -43,12 +83,12 @@ class ShowThemeViewSet(ModelViewSet):
     def get_queryset(self):
         """Retrieve shows with filters"""
         name = self.request.query_params.get("name")
-        queryset = self.queryset
+        queryset = self.queryset.all()
 
         if name:
             queryset = queryset.filter(name__icontains=name)
 
-        return queryset.distinct()
+        return queryset
 
     # Only for docs
     @extend_schema(
@@ -67,35 +107,160 @@ class ShowThemeViewSet(ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class AstronomyShowViewSet(ModelViewSet):
+class AstronomyShowViewSet(CatalogCacheMixin, ModelViewSet):
     queryset = AstronomyShow.objects.all()
     serializer_class = AstronomyShowSerializer
+    cache_models = (AstronomyShow,)
+    etag_fields = ("updated_at", "themes__updated_at")
+
+    @staticmethod
+    def search(queryset, q):
+        """Filter shows matching q, best matches first"""
+        query = SearchQuery(
+            q, search_type="websearch", config=AstronomyShow.SEARCH_CONFIG
+        )
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(rank=SearchRank(F("search_vector"), query))
+            .order_by("-rank", "id")
+        )
 
     def get_queryset(self):
+        """Retrieve shows with full-text search ranked by relevance"""
+        q = self.request.query_params.get("q")
         queryset = self.queryset.prefetch_related("themes")
+
+        if q:
+            queryset = self.search(queryset, q)
+
         return queryset
 
+    # Only for docs
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                type={"type": "string"},
+                description=(
+                    "Full-text search over show title and description, "
+                    "best matches first. Example: ?q=black hole"
+                ),
+            )
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
 
-class PlanetariumDomeViewSet(ModelViewSet):
+class PlanetariumDomeViewSet(CatalogCacheMixin, ModelViewSet):
     queryset = PlanetariumDome.objects.all()
     serializer_class = PlanetariumDomeSerializer
+    cache_models = (PlanetariumDome,)
+
+
+class ShowSessionPagination(CursorPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("show_time", "id")
 
 
-class ShowSessionViewSet(ModelViewSet):
+class ShowSessionViewSet(ConditionalGetMixin, ModelViewSet):
     queryset = ShowSession.objects.all()
     serializer_class = ShowSessionListSerializer
+    pagination_class = ShowSessionPagination
+    etag_fields = (
+        "updated_at",
+        "astronomy_show__updated_at",
+        "astronomy_show__themes__updated_at",
+        "planetarium_dome__updated_at",
+    )
 
-    def get_queryset(self):
-        return self.queryset.select_related(
-            "astronomy_show", "planetarium_dome"
-        ).annotate(
-            tickets_available=(
-                F("planetarium_dome__rows")
-                * F("planetarium_dome__seats_in_row")
-                - Count("tickets")
+    @staticmethod
+    def _params_to_ints(qs):
+        """Converts a list of string IDs to a list of integers"""
+        try:
+            return [int(str_id) for str_id in qs.split(",")]
+        except ValueError:
+            raise ValidationError("IDs must be comma separated integers")
+
+    @staticmethod
+    def _param_to_datetime(value, end_of_day=False):
+        """
+        Converts an ISO date or datetime to an aware datetime,
+        a bare date means the start (or the end) of that day
+        """
+        try:
+            date = parse_date(value)
+            moment = None if date else parse_datetime(value)
+        except ValueError:
+            date = moment = None
+        if date is not None:
+            moment = datetime.datetime.combine(
+                date, datetime.time.max if end_of_day else datetime.time.min
+            )
+        if moment is None:
+            raise ValidationError(
+                f"{value} is not a valid ISO date or datetime"
+            )
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    @staticmethod
+    def with_tickets_available(queryset):
+        """Sessions with their show, dome and tickets_available"""
+        return (
+            queryset.select_related("astronomy_show", "planetarium_dome")
+            .prefetch_related("astronomy_show__themes")
+            .annotate(
+                tickets_available=(
+                    F("planetarium_dome__rows")
+                    * F("planetarium_dome__seats_in_row")
+                    - F("tickets_sold")
+                )
             )
         )
 
+    @classmethod
+    def filter_list(cls, queryset, params, prefix=""):
+        """
+        Scheduled sessions matching the list filters in params, or rows
+        of the sessions at prefix, e.g. "show_session__"
+        """
+        lookups = {"show_time__isnull": False}
+        if params.get("date_from"):
+            lookups["show_time__gte"] = cls._param_to_datetime(
+                params["date_from"]
+            )
+        if params.get("date_to"):
+            lookups["show_time__lte"] = cls._param_to_datetime(
+                params["date_to"], end_of_day=True
+            )
+        if params.get("show"):
+            lookups["astronomy_show_id__in"] = cls._params_to_ints(
+                params["show"]
+            )
+        if params.get("dome"):
+            lookups["planetarium_dome_id__in"] = cls._params_to_ints(
+                params["dome"]
+            )
+        return queryset.filter(
+            **{prefix + lookup: value for lookup, value in lookups.items()}
+        )
+
+    def get_queryset(self):
+        """Retrieve sessions with filters"""
+        if self.action == "seats":
+            return self.queryset.select_related("planetarium_dome")
+
+        queryset = self.with_tickets_available(self.queryset)
+
+        if self.action == "list":
+            queryset = self.filter_list(queryset, self.request.query_params)
+
+        return queryset
+
     def get_serializer_class(self):
         if self.action == "retrieve":
             return ShowSessionDetailSerializer
@@ -103,6 +268,128 @@ class ShowSessionViewSet(ModelViewSet):
             return self.serializer_class
         return ShowSessionEditSerializer
 
+    # Only for docs
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "date_from",
+                type={"type": "string"},
+                description=(
+                    "Sessions starting at or after a date or datetime. "
+                    "Example: ?date_from=2024-01-31"
+                ),
+            ),
+            OpenApiParameter(
+                "date_to",
+                type={"type": "string"},
+                description=(
+                    "Sessions starting at or before a datetime, "
+                    "or on or before a date. Example: ?date_to=2024-02-29"
+                ),
+            ),
+            OpenApiParameter(
+                "show",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Filter by show id. Example: ?show=1,2",
+            ),
+            OpenApiParameter(
+                "dome",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Filter by dome id. Example: ?dome=1,2",
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "dry_run",
+                type={"type": "boolean"},
+                description=(
+                    "Validate the sessions without creating them. "
+                    "Example: ?dry_run=true"
+                ),
+            )
+        ]
+    )
+    @action(
+        detail=False, methods=["post"], url_path="import", url_name="import"
+    )
+    def bulk_import(self, request):
+        """
+        Create sessions from a JSON array of objects, or an uploaded CSV
+        or JSON file, with astronomy_show, planetarium_dome and show_time.
+        Shows and domes are given by id, or by title and name.
+        """
+        upload = request.FILES.get("file")
+        rows = read_schedule(upload) if upload else request.data
+        dry_run = request.query_params.get("dry_run") in ("1", "true")
+        count = import_schedule(rows, dry_run=dry_run)
+        return Response(
+            {"sessions": count, "created": not dry_run},
+            status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "encoding",
+                type={"type": "string", "enum": ["bitmap", "json"]},
+                description=(
+                    "bitmap (default): base64 of a row-major bitmap, "
+                    "one bit per seat, set bit means taken. "
+                    "json: list of taken [row, seat] pairs. "
+                    "Example: ?encoding=json"
+                ),
+            )
+        ]
+    )
+    @action(detail=True, methods=["get"])
+    def seats(self, request, pk=None):
+        """Occupancy of every seat in the session's dome"""
+        return self.conditional_response(self.seat_map, request, pk=pk)
+
+    def get_seat_map(self):
+        # keyed like the invalidation, by id rather than by URL, e.g. 01
+        try:
+            pk = int(self.kwargs["pk"])
+        except ValueError:
+            raise NotFound
+        seat_map = get_cached_seat_map(pk)
+        if seat_map is None:
+            seat_map = cache_seat_map(self.get_object())
+        return seat_map
+
+    def get_validators(self, request):
+        if self.action != "seats":
+            return super().get_validators(request)
+
+        # the cached bitmap is the seat map's own version
+        seat_map = self.get_seat_map()
+        source = repr(
+            (
+                seat_map["rows"],
+                seat_map["seats_in_row"],
+                seat_map["bitmap"],
+                request.GET.urlencode(),
+            )
+        )
+        return f'"{hashlib.md5(source.encode()).hexdigest()}"', None
+
+    def seat_map(self, request, pk=None):
+        seat_map = self.get_seat_map()
+        rows, seats_in_row = seat_map["rows"], seat_map["seats_in_row"]
+        data = {"id": int(pk), "rows": rows, "seats_in_row": seats_in_row}
+        if request.query_params.get("encoding") == "json":
+            data["taken"] = unpack_bitmap(
+                seat_map["bitmap"], rows, seats_in_row
+            )
+        else:
+            data["bitmap"] = encode_bitmap(seat_map["bitmap"])
+        return Response(data)
+
 
 class OrderPagination(PageNumberPagination):
     page_size = 10
@@ -110,6 +397,7 @@ class OrderPagination(PageNumberPagination):
 
 
 class ReservationViewSet(
+    ConditionalGetMixin,
     mixins.RetrieveModelMixin,
     mixins.DestroyModelMixin,
     mixins.ListModelMixin,
@@ -118,18 +406,63 @@ class ReservationViewSet(
     queryset = Reservation.objects.all()
     serializer_class = ReservationSerializer
     pagination_class = OrderPagination
+    # rendered with the user's email, which saving the user bumps
+    etag_fields = ("created_at", "user__updated_at")
 
     def get_queryset(self):
         return self.queryset.select_related("user")
 
 
+class UserReservationPagination(CursorPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+
+class UserReservationView(generics.ListAPIView):
+    """
+    Reservations of the current user, newest first, with their tickets,
+    sessions, shows and domes in three queries per page
+    """
+
+    serializer_class = UserReservationSerializer
+    pagination_class = UserReservationPagination
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return Reservation.objects.filter(
+            user=self.request.user
+        ).prefetch_related(
+            Prefetch(
+                "tickets",
+                queryset=Ticket.objects.select_related(
+                    "show_session__astronomy_show",
+                    "show_session__planetarium_dome",
+                ).order_by("row", "seat"),
+            ),
+            "tickets__show_session__astronomy_show__themes",
+        )
+
+
 class TicketViewSet(
-    mixins.ListModelMixin, mixins.CreateModelMixin, GenericViewSet
+    ConditionalGetMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    GenericViewSet,
 ):
     queryset = Ticket.objects.all()
     serializer_class = TicketEditSerializer
     pagination_class = OrderPagination
     permission_classes = (IsAuthenticated,)
+    # show_session is rendered with the show title and the dome name
+    etag_fields = (
+        "id",
+        "show_session__updated_at",
+        "show_session__astronomy_show__updated_at",
+        "show_session__planetarium_dome__updated_at",
+        "reservation__user__updated_at",
+    )
 
     def perform_create(self, serializer):
         """Automatically make a reservation"""
@@ -140,15 +473,265 @@ class TicketViewSet(
                 raise ValidationError(
                     "Error with data. Check if you are logged in."
                 )
+            claim_seats(
+                serializer.validated_data["show_session"].id,
+                [
+                    (
+                        serializer.validated_data["row"],
+                        serializer.validated_data["seat"],
+                    )
+                ],
+                user,
+            )
             reservation = Reservation.objects.create(
                 user=user, created_at=created_at
             )
-            serializer.save(reservation=reservation)
+            try:
+                serializer.save(reservation=reservation)
+            except IntegrityError:
+                raise SeatsTaken(
+                    [
+                        (
+                            serializer.validated_data["row"],
+                            serializer.validated_data["seat"],
+                        )
+                    ]
+                )
+
+    @action(detail=False, methods=["post"])
+    def book(self, request):
+        """Book several seats of one session under a single reservation"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def get_serializer_class(self):
         if self.action in ("retrieve", "list"):
             return TicketSerializer
+        if self.action == "book":
+            return TicketBatchSerializer
         return self.serializer_class
 
     def get_queryset(self):
-        return self.queryset.prefetch_related("reservation", "show_session")
+        return self.queryset.select_related(
+            "reservation__user",
+            "show_session__astronomy_show",
+            "show_session__planetarium_dome",
+        )
+
+
+class SeatHoldViewSet(
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+    GenericViewSet,
+):
+    """Seats held by the current user until checkout or expiry"""
+
+    queryset = SeatHold.objects.all()
+    serializer_class = SeatHoldSerializer
+    pagination_class = OrderPagination
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.queryset.filter(
+            user=self.request.user, expires_at__gt=timezone.now()
+        )
+
+    def get_serializer_class(self):
+        if self.action == "create":
+            return SeatHoldBatchSerializer
+        if self.action == "checkout":
+            return SeatHoldCheckoutSerializer
+        return self.serializer_class
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=["post"])
+    def checkout(self, request):
+        """Convert the held seats of a session into tickets"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class SessionRecurrenceViewSet(ModelViewSet):
+    """
+    Recurring sessions for staff, expanded into sessions with POST to
+    expand/. Expanding again adds the sessions missing since, changing
+    or deleting a recurrence leaves its sessions alone.
+    """
+
+    queryset = SessionRecurrence.objects.order_by("id")
+    serializer_class = SessionRecurrenceSerializer
+    permission_classes = (IsAdminUser,)
+
+    @action(detail=True, methods=["post"])
+    def expand(self, request, pk=None):
+        """Create the sessions of the recurrence from today on"""
+        created = expand_recurrence(self.get_object())
+        return Response({"created": created}, status=status.HTTP_200_OK)
+
+
+class ReportPagination(PageNumberPagination):
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+class OccupancyReportViewSet(GenericViewSet):
+    """
+    Seats, sold tickets and occupancy by session, show, dome, day or
+    week for staff. Reports only read the SessionOccupancy rollups and
+    are as fresh as the last refresh_occupancy run. They take the
+    date_from, date_to, show and dome filters of the session list.
+    """
+
+    queryset = SessionOccupancy.objects.all()
+    pagination_class = ReportPagination
+    permission_classes = (IsAdminUser,)
+
+    def report(self, request, ordering, *fields, **expressions):
+        rows = (
+            ShowSessionViewSet.filter_list(
+                self.get_queryset(), request.query_params
+            )
+            .values(*fields, **expressions)
+            .annotate(
+                sessions=Count("pk"),
+                seats=Sum("seats"),
+                tickets_sold=Sum("tickets_sold"),
+            )
+            .order_by(*ordering)
+        )
+        page = self.paginate_queryset(rows)
+        for row in page:
+            row["occupancy"] = (
+                round(row["tickets_sold"] / row["seats"], 4)
+                if row["seats"]
+                else None
+            )
+        return self.get_paginated_response(page)
+
+    @action(detail=False, methods=["get"])
+    def sessions(self, request):
+        return self.report(
+            request,
+            ("show_time", "show_session"),
+            "show_session",
+            "show_time",
+            "astronomy_show",
+            "planetarium_dome",
+        )
+
+    @action(detail=False, methods=["get"])
+    def shows(self, request):
+        return self.report(
+            request,
+            ("title", "astronomy_show"),
+            "astronomy_show",
+            title=F("astronomy_show__title"),
+        )
+
+    @action(detail=False, methods=["get"])
+    def domes(self, request):
+        return self.report(
+            request,
+            ("name", "planetarium_dome"),
+            "planetarium_dome",
+            name=F("planetarium_dome__name"),
+        )
+
+    @action(detail=False, methods=["get"])
+    def days(self, request):
+        return self.report(request, ("day",), day=TruncDate("show_time"))
+
+    @action(detail=False, methods=["get"])
+    def weeks(self, request):
+        return self.report(
+            request,
+            ("week",),
+            week=TruncWeek("show_time", output_field=DateField()),
+        )
+
+
+class ExportViewSet(GenericViewSet):
+    """
+    Tickets and reservations streamed to staff as CSV or NDJSON, chosen
+    with ?format= or the Accept header. Tickets take the date_from,
+    date_to, show and dome filters of the session list, reservations
+    filter their creation time with date_from and date_to.
+    """
+
+    permission_classes = (IsAdminUser,)
+    renderer_classes = (CSVRenderer, NDJSONRenderer)
+
+    def export(self, request, name, queryset, columns):
+        renderer = request.accepted_renderer
+        # rows are read after the request, outside the database routing
+        queryset = queryset.using(queryset.db)
+        stream = (
+            astream_export
+            if isinstance(request._request, ASGIRequest)
+            else stream_export
+        )
+        response = StreamingHttpResponse(
+            stream(renderer, queryset, columns),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{name}.{renderer.format}"'
+        )
+        return response
+
+    @action(detail=False, methods=["get"])
+    def tickets(self, request):
+        queryset = ShowSessionViewSet.filter_list(
+            Ticket.objects.order_by("id"),
+            request.query_params,
+            prefix="show_session__",
+        )
+        return self.export(
+            request,
+            "tickets",
+            queryset,
+            {
+                "id": "id",
+                "reservation": "reservation_id",
+                "reserved_at": "reservation__created_at",
+                "user": "reservation__user__email",
+                "show_session": "show_session_id",
+                "show_time": "show_session__show_time",
+                "show": "show_session__astronomy_show__title",
+                "dome": "show_session__planetarium_dome__name",
+                "row": "row",
+                "seat": "seat",
+            },
+        )
+
+    @action(detail=False, methods=["get"])
+    def reservations(self, request):
+        queryset = Reservation.objects.order_by("id")
+        date_from = request.query_params.get("date_from")
+        date_to = request.query_params.get("date_to")
+        if date_from:
+            queryset = queryset.filter(
+                created_at__gte=ShowSessionViewSet._param_to_datetime(
+                    date_from
+                )
+            )
+        if date_to:
+            queryset = queryset.filter(
+                created_at__lte=ShowSessionViewSet._param_to_datetime(
+                    date_to, end_of_day=True
+                )
+            )
+        return self.export(
+            request,
+            "reservations",
+            queryset,
+            {"id": "id", "created_at": "created_at", "user": "user__email"},
+        )
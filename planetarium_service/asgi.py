@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "planetarium_service.settings")
+# requests run on threads of their own, which persistent connections
+# cannot be reused across, so borrow connections from the pool
+os.environ.setdefault("DB_POOL", "1")
 
 application = get_asgi_application()
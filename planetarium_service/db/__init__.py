@@ -0,0 +1,4 @@
+"""
+PostgreSQL backend taking its connections from a per-process pool.
+Use "planetarium_service.db" as the ENGINE of a database.
+"""
@@ -0,0 +1,54 @@
+from django.db.backends.postgresql import base, creation
+
+from planetarium_service.db.pool import (
+    PoolTimeout,
+    get_pool,
+    close_pools,
+)
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # pooled connections would keep the test database in use
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL connections borrowed from a per-process pool and given back
+    when Django closes them. Configured by the POOL dict of the database:
+    MIN_SIZE, MAX_SIZE, TIMEOUT, CHECK_AFTER and MAX_IDLE (seconds).
+    """
+
+    creation_class = DatabaseCreation
+
+    @property
+    def pool(self):
+        options = self.settings_dict.get("POOL", {})
+        return get_pool(
+            self.alias,
+            self.settings_dict["NAME"],
+            min_size=options.get("MIN_SIZE", 0),
+            max_size=options.get("MAX_SIZE", 10),
+            timeout=options.get("TIMEOUT", 5.0),
+            check_after=options.get("CHECK_AFTER", 30.0),
+            max_idle=options.get("MAX_IDLE", 300.0),
+        )
+
+    def get_new_connection(self, conn_params):
+        connect = super().get_new_connection
+        try:
+            connection = self.pool.getconn(lambda: connect(conn_params))
+        except PoolTimeout as error:
+            raise self.Database.OperationalError(str(error)) from error
+        self.isolation_level = base.IsolationLevel(
+            self.settings_dict["OPTIONS"].get(
+                "isolation_level", base.IsolationLevel.READ_COMMITTED
+            )
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            self.pool.putconn(self.connection)
@@ -0,0 +1,172 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of DB-API connections opened on demand up to
+    max_size. Checkout waits up to timeout for a free connection and
+    checks connections idle for more than check_after seconds. Idle
+    connections above min_size are closed after max_idle seconds.
+    """
+
+    def __init__(
+        self,
+        min_size=0,
+        max_size=10,
+        timeout=5.0,
+        check_after=30.0,
+        max_idle=300.0,
+    ):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_after = check_after
+        self.max_idle = max_idle
+        self.condition = threading.Condition()
+        self.idle = deque()
+        self.size = 0
+        self.waiting = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+
+    def getconn(self, connect):
+        """Borrow an idle connection or open a new one with connect()"""
+        started = time.monotonic()
+        with self.condition:
+            while not self.idle and self.size >= self.max_size:
+                remaining = started + self.timeout - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f"No connection available in {self.timeout}s, "
+                        f"all {self.max_size} are in use"
+                    )
+                self.waiting += 1
+                try:
+                    self.condition.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            if self.idle:
+                connection, returned_at = self.idle.pop()
+            else:
+                connection, returned_at = None, None
+                self.size += 1
+            self.checkouts += 1
+            self.wait_seconds += time.monotonic() - started
+
+        try:
+            if connection is not None and not self.is_usable(
+                connection, returned_at
+            ):
+                self.close(connection)
+                connection = None
+            if connection is None:
+                connection = connect()
+        except BaseException:
+            self.release_slot()
+            raise
+        return connection
+
+    def putconn(self, connection):
+        """Give a connection back, closing it if it is broken"""
+        if not connection.closed and connection.info.transaction_status:
+            try:
+                connection.rollback()
+            except Exception:
+                self.close(connection)
+        if connection.closed:
+            self.release_slot()
+            return
+
+        now = time.monotonic()
+        expired = []
+        with self.condition:
+            self.idle.append((connection, now))
+            while (
+                len(self.idle) > self.min_size
+                and now - self.idle[0][1] > self.max_idle
+            ):
+                expired.append(self.idle.popleft()[0])
+                self.size -= 1
+            self.condition.notify()
+        for connection in expired:
+            self.close(connection)
+
+    def is_usable(self, connection, returned_at):
+        if connection.closed:
+            return False
+        if time.monotonic() - returned_at < self.check_after:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    def close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def release_slot(self):
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    def close_idle(self):
+        with self.condition:
+            idle, self.idle = self.idle, deque()
+            self.size -= len(idle)
+        for connection, _ in idle:
+            self.close(connection)
+
+    def stats(self):
+        with self.condition:
+            return {
+                "size": self.size,
+                "max_size": self.max_size,
+                "idle": len(self.idle),
+                "in_use": self.size - len(self.idle),
+                "waiting": self.waiting,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds": self.wait_seconds,
+            }
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(alias, database, **options):
+    """The pool of this process for a database alias and name"""
+    key = (alias, database)
+    with pools_lock:
+        if key not in pools:
+            pools[key] = ConnectionPool(**options)
+        return pools[key]
+
+
+def pool_stats():
+    """Stats of every pool of this process by (alias, database name)"""
+    with pools_lock:
+        current = dict(pools)
+    return {key: pool.stats() for key, pool in current.items()}
+
+
+def close_pools():
+    with pools_lock:
+        current = list(pools.values())
+    for pool in current:
+        pool.close_idle()
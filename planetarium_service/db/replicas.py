@@ -0,0 +1,157 @@
+"""
+Read replicas: ReplicaMiddleware picks the database the reads of a
+request go to and ReplicaRouter sends them there. Replicas are the
+DATABASE_REPLICAS aliases of DATABASES.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+PIN_COOKIE = "read_primary"
+
+# replica serving the reads of the current request, None for the primary
+read_database = ContextVar("read_database", default=None)
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary in the block, e.g. to fill caches"""
+    token = read_database.set(None)
+    try:
+        yield
+    finally:
+        read_database.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Send reads to the replica of the current request, reads in
+    transactions and all writes and migrations to the primary
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = read_database.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def pin_key(user_id):
+    return f"replica-pin:{user_id}"
+
+
+def token_user_id(request):
+    """User id of the request's valid access token, without a query"""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = header and authentication.get_raw_token(header)
+    if not raw_token:
+        return None
+    try:
+        return AccessToken(raw_token).get(jwt_settings.USER_ID_CLAIM)
+    except TokenError:
+        return None
+
+
+class ReplicaMiddleware:
+    """
+    Read from a random replica in safe requests. A client that wrote
+    something in the last REPLICA_PIN_SECONDS keeps reading from the
+    primary so that it sees its writes despite replication lag. Writers
+    are known by a cookie and, for token clients of other workers, by
+    their user id in the REPLICA_PIN_CACHE cache.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @property
+    def cache(self):
+        return caches[settings.REPLICA_PIN_CACHE]
+
+    def choose(self, request, pinned):
+        if (
+            not settings.DATABASE_REPLICAS
+            or request.method not in SAFE_METHODS
+            or request.COOKIES.get(PIN_COOKIE)
+            or pinned
+        ):
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        user_id = token_user_id(request)
+        pinned = user_id is not None and self.cache.get(pin_key(user_id))
+        token = read_database.set(self.choose(request, pinned))
+        try:
+            response = self.get_response(request)
+        finally:
+            read_database.reset(token)
+        key = self.pin(request, response)
+        if key is not None:
+            self.cache.set(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        user_id = token_user_id(request)
+        pinned = user_id is not None and await self.cache.aget(
+            pin_key(user_id)
+        )
+        token = read_database.set(self.choose(request, pinned))
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_database.reset(token)
+        key = self.pin(request, response)
+        if key is not None:
+            await self.cache.aset(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    @staticmethod
+    def pin(request, response):
+        """
+        Pin the client of a successful write with the cookie, return the
+        cache key pinning its user if it has one
+        """
+        if request.method in SAFE_METHODS or response.status_code >= 400:
+            return None
+        response.set_cookie(
+            PIN_COOKIE,
+            "1",
+            max_age=settings.REPLICA_PIN_SECONDS,
+            httponly=True,
+            samesite="Lax",
+        )
+        # DRF sets the token user on the Django request too
+        user = getattr(request, "user", None)
+        if user is None or not user.is_authenticated:
+            return None
+        return pin_key(getattr(user, jwt_settings.USER_ID_FIELD))
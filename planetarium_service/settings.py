@@ -30,13 +30,13 @@ ALLOWED_HOSTS = ["127.0.0.1"]
 # Application definition
 
 INSTALLED_APPS = [
-    "debug_toolbar",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "planetarium",
     "user",
@@ -45,8 +45,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "planetarium.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -55,6 +55,28 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# The toolbar only renders on HTML pages with DEBUG on,
+# so it is left out of the API unless asked for.
+DEBUG_TOOLBAR = os.environ.get("DEBUG_TOOLBAR") == "1"
+
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS.insert(0, "debug_toolbar")
+    MIDDLEWARE.insert(2, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
+# Request profiling
+# cProfile a share of requests (0..1), with sampled stacks, and/or every
+# request, keeping the ones slower than PROFILE_SLOW_MS. The threshold
+# roughly doubles the time spent in Python, keep it for investigations;
+# see planetarium.profiling.
+
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+PROFILE_SLOW_MS = int(os.environ.get("PROFILE_SLOW_MS", 0))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", BASE_DIR / "profiles")
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", 200))
+
+if PROFILE_SAMPLE_RATE or PROFILE_SLOW_MS:
+    MIDDLEWARE.insert(1, "planetarium.profiling.ProfilingMiddleware")
+
 ROOT_URLCONF = "planetarium_service.urls"
 
 TEMPLATES = [
@@ -78,17 +100,72 @@ WSGI_APPLICATION = "planetarium_service.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Connections are kept open for DB_CONN_MAX_AGE seconds between requests
+# and checked before reuse. With DB_POOL=1 each worker process borrows
+# them from a pool of at most DB_POOL_MAX_SIZE instead (see
+# planetarium_service.db), so workers * DB_POOL_MAX_SIZE must stay below
+# the server's max_connections. Under ASGI every request runs on a new
+# thread, so DB_CONN_MAX_AGE has no effect there and the ASGI application
+# defaults to DB_POOL=1.
+
+DB_POOL = os.environ.get("DB_POOL") == "1"
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": (
+            "planetarium_service.db"
+            if DB_POOL
+            else "django.db.backends.postgresql"
+        ),
         "HOST": os.environ["DB_HOST"],
         "NAME": os.environ["DB_NAME"],
         "USER": os.environ["DB_USER"],
         "PASSWORD": os.environ["DB_PASSWORD"],
         "PORT": os.environ["DB_PORT"],
+        "CONN_MAX_AGE": (
+            0 if DB_POOL else int(os.environ.get("DB_CONN_MAX_AGE", 60))
+        ),
+        "CONN_HEALTH_CHECKS": True,
+        "POOL": {
+            "MIN_SIZE": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+            "MAX_SIZE": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+            "TIMEOUT": float(os.environ.get("DB_POOL_TIMEOUT", 5)),
+        },
     }
 }
 
+# Read replicas
+# DB_REPLICAS lists replicas of the database as host[:port][/name],
+# comma separated, with the rest of the settings of the primary. Safe
+# requests read from one of them unless their client wrote something in
+# the last REPLICA_PIN_SECONDS (see planetarium_service.db.replicas).
+# REPLICA_PIN_CACHE must be shared between workers to pin token clients
+# in all of them. Tests run replicas as mirrors of the test database.
+
+DATABASE_REPLICAS = []
+
+for number, replica in enumerate(
+    filter(None, os.environ.get("DB_REPLICAS", "").split(",")), start=1
+):
+    location, _, name = replica.strip().partition("/")
+    host, _, port = location.partition(":")
+    alias = f"replica{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host or DATABASES["default"]["HOST"],
+        "PORT": port or DATABASES["default"]["PORT"],
+        "NAME": name or DATABASES["default"]["NAME"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ["planetarium_service.db.replicas.ReplicaRouter"]
+    MIDDLEWARE.insert(1, "planetarium_service.db.replicas.ReplicaMiddleware")
+
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 5))
+REPLICA_PIN_CACHE = os.environ.get("REPLICA_PIN_CACHE", "default")
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -134,15 +211,82 @@ INTERNAL_IPS = [
 
 AUTH_USER_MODEL = "user.User"
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The catalog cache must be shared between workers (e.g. RedisCache
+# with maxmemory-policy allkeys-lru) for writes to be seen by all of them.
+# LocMemCache evicts least recently used entries past MAX_ENTRIES.
+# The throttle cache holds the request counters of planetarium.throttling
+# and must be shared as well (e.g. RedisCache or PyMemcacheCache, which
+# increment atomically) for the rates to hold across workers; LocMemCache
+# is a per-process stand-in. So is it for the seat map cache, which
+# workers invalidate on every booking, the dome shape cache, which
+# bookings are checked against, and the default cache, which holds the
+# replica pins and the users of access tokens. docker-compose.yml points
+# every cache at its redis service.
+
+DEFAULT_CACHE_BACKEND = os.environ.get(
+    "DEFAULT_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+)
+CATALOG_CACHE_BACKEND = os.environ.get(
+    "CATALOG_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+)
+THROTTLE_CACHE_BACKEND = os.environ.get(
+    "THROTTLE_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+)
+SEAT_MAP_CACHE_BACKEND = os.environ.get(
+    "SEAT_MAP_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+)
+DOME_SHAPE_CACHE_BACKEND = os.environ.get(
+    "DOME_SHAPE_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+)
+
+CACHES = {
+    "default": {
+        "BACKEND": DEFAULT_CACHE_BACKEND,
+        "LOCATION": os.environ.get("DEFAULT_CACHE_LOCATION", ""),
+    },
+    "catalog": {
+        "BACKEND": CATALOG_CACHE_BACKEND,
+        "LOCATION": os.environ.get("CATALOG_CACHE_LOCATION", "catalog"),
+        "TIMEOUT": int(os.environ.get("CATALOG_CACHE_TIMEOUT", 60 * 60)),
+    },
+    "throttle": {
+        "BACKEND": THROTTLE_CACHE_BACKEND,
+        "LOCATION": os.environ.get("THROTTLE_CACHE_LOCATION", "throttle"),
+    },
+    "seat_map": {
+        "BACKEND": SEAT_MAP_CACHE_BACKEND,
+        "LOCATION": os.environ.get("SEAT_MAP_CACHE_LOCATION", "seat_map"),
+    },
+    "dome_shape": {
+        "BACKEND": DOME_SHAPE_CACHE_BACKEND,
+        "LOCATION": os.environ.get("DOME_SHAPE_CACHE_LOCATION", "dome_shape"),
+    },
+}
+
+if CATALOG_CACHE_BACKEND.endswith("LocMemCache"):
+    CACHES["catalog"]["OPTIONS"] = {
+        "MAX_ENTRIES": int(os.environ.get("CATALOG_CACHE_MAX_ENTRIES", 10000))
+    }
+
+if THROTTLE_CACHE_BACKEND.endswith("LocMemCache"):
+    # two counters per client, culling would reset them
+    CACHES["throttle"]["OPTIONS"] = {"MAX_ENTRIES": 100000}
+
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "planetarium.metrics.JSONRenderer",
+        "planetarium.metrics.BrowsableAPIRenderer",
+    ],
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "planetarium.throttling.AnonRateThrottle",
+        "planetarium.throttling.UserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {"anon": "300/day", "user": "1000/day"},
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "planetarium.permissions.IsAdminOrIfAuthenticatedReadOnly",
@@ -165,3 +309,27 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=3),
 }
+
+# The id, is_active and is_staff of the users of access tokens are
+# cached for AUTH_USER_CACHE_TIMEOUT seconds. Saving a user drops them
+# from AUTH_USER_CACHE, which must be shared between workers (e.g. the
+# default cache on RedisCache) for deactivated users to be rejected by
+# all of them; with LocMemCache other workers only see the change once
+# their entry expires.
+
+AUTH_USER_CACHE = os.environ.get("AUTH_USER_CACHE", "default")
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get("AUTH_USER_CACHE_TIMEOUT", 60))
+
+SEAT_HOLD_MINUTES = int(os.environ.get("SEAT_HOLD_MINUTES", 10))
+
+# Request metrics
+# Server-Timing headers carry SQL, rendering and total time per request,
+# /metrics exposes the histograms of each process to Prometheus. A scrape
+# reaches one worker, so run one worker per scraped address (e.g.
+# containers with WEB_CONCURRENCY=1) when the metrics must add up.
+
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "1") == "1"
+
+METRICS_ALLOWED_IPS = os.environ.get(
+    "METRICS_ALLOWED_IPS", ",".join(INTERNAL_IPS)
+).split(",")
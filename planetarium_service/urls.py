@@ -14,6 +14,8 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import (
@@ -22,9 +24,11 @@ from drf_spectacular.views import (
     SpectacularRedocView,
 )
 
+from planetarium.metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("__debug__/", include("debug_toolbar.urls")),
+    path("metrics", metrics_view, name="metrics"),
     path("api/user/", include("user.urls", namespace="user")),
     path("api/", include("planetarium.urls", namespace="api")),
     path("api/docs/download/", SpectacularAPIView.as_view(), name="schema"),
@@ -39,3 +43,6 @@ urlpatterns = [
         name="redoc",
     ),
 ]
+
+if settings.DEBUG_TOOLBAR:
+    urlpatterns.append(path("__debug__/", include("debug_toolbar.urls")))
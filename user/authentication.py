@@ -0,0 +1,86 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from planetarium_service.db.replicas import use_primary
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def get_user_cache():
+    return caches[settings.AUTH_USER_CACHE]
+
+
+def get_principal(user):
+    """The fields of user kept in the cache, without its password hash"""
+    return {
+        field: getattr(user, field)
+        for field in (user._meta.pk.attname, "is_active", "is_staff")
+    }
+
+
+def user_from_principal(principal):
+    """A user of the cached fields, loading the others when read"""
+    model = get_user_model()
+    fields = [
+        field.attname
+        for field in model._meta.concrete_fields
+        if field.attname in principal
+    ]
+    return model.from_db(None, fields, [principal[field] for field in fields])
+
+
+def invalidate_cached_user(user_id):
+    """
+    Drop the cached user now and once more on commit, so nothing read
+    before the commit outlives it
+    """
+    key = user_cache_key(user_id)
+    get_user_cache().delete(key)
+    transaction.on_commit(lambda: get_user_cache().delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication keeping the id, is_active and is_staff of the
+    active users of tokens in the AUTH_USER_CACHE cache for
+    AUTH_USER_CACHE_TIMEOUT seconds, which saves the user query of
+    authenticated requests. request.user only holds those fields and
+    loads the others when read, so views writing a user must read it
+    again. Saving or deleting a user drops it from the cache (see
+    user.signals); queryset updates do not, and are only seen once the
+    entry expires.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # the check needs the password hash, which is not cached
+            return super().get_user(validated_token)
+        key = user_cache_key(validated_token.get(api_settings.USER_ID_CLAIM))
+        principal = get_user_cache().get(key)
+        if principal is None:
+            # a lagging replica would cache an outdated user
+            with use_primary():
+                user = super().get_user(validated_token)
+            get_user_cache().set(
+                key, get_principal(user), settings.AUTH_USER_CACHE_TIMEOUT
+            )
+            return user
+        return user_from_principal(principal)
+
+    async def aget_user(self, validated_token):
+        """Async get_user"""
+        if not api_settings.CHECK_REVOKE_TOKEN:
+            key = user_cache_key(
+                validated_token.get(api_settings.USER_ID_CLAIM)
+            )
+            principal = await get_user_cache().aget(key)
+            if principal is not None:
+                return user_from_principal(principal)
+        return await sync_to_async(self.get_user)(validated_token)
@@ -0,0 +1,11 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+
+from user.authentication import invalidate_cached_user
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def invalidate_user(sender, instance, **kwargs):
+    invalidate_cached_user(getattr(instance, api_settings.USER_ID_FIELD))
@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from planetarium.models import ShowTheme
+from user.authentication import user_cache_key
+
+THEMES_URL = reverse("planetarium:showtheme-list")
+ME_URL = reverse("user:manage")
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self) -> None:
+        caches["default"].clear()
+        caches["catalog"].clear()
+        ShowTheme.objects.create(name="TestTheme")
+        self.user = get_user_model().objects.create_user(
+            email="test2user@tests.test", password="testUser123"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_user_query_is_cached(self):
+        self.client.get(THEMES_URL)
+
+        # the catalog response and the user both come from caches
+        with self.assertNumQueries(0):
+            res = self.client.get(THEMES_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_updates_through_the_api_are_seen(self):
+        res = self.client.patch(ME_URL, {"email": "new@tests.test"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.data["email"], "new@tests.test")
+
+    def test_password_hash_is_not_cached(self):
+        self.client.get(THEMES_URL)
+
+        self.assertEqual(
+            caches["default"].get(user_cache_key(self.user.id)),
+            {"id": self.user.id, "is_active": True, "is_staff": False},
+        )
+
+    def test_updates_keep_fields_changed_elsewhere(self):
+        self.client.get(THEMES_URL)
+        # unseen by the cached user, as from another worker
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            password="reset", is_active=False
+        )
+
+        self.client.patch(ME_URL, {"email": "new@tests.test"})
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, "new@tests.test")
+        self.assertEqual(self.user.password, "reset")
+        self.assertFalse(self.user.is_active)
+
+    def test_deactivated_users_are_rejected(self):
+        self.client.get(THEMES_URL)
+
+        # as saved from the admin
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(THEMES_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_users_are_rejected(self):
+        self.client.get(THEMES_URL)
+        self.user.delete()
+
+        res = self.client.get(THEMES_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
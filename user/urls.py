@@ -5,6 +5,7 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 
+from planetarium.views import UserReservationView
 from user.views import CreateUserView, ManageUserView
 
 app_name = "user"
@@ -15,4 +16,9 @@ urlpatterns = [
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("token/verify/", TokenVerifyView.as_view(), name="token_verify"),
     path("me/", ManageUserView.as_view(), name="manage"),
+    path(
+        "me/reservations/",
+        UserReservationView.as_view(),
+        name="reservations",
+    ),
 ]
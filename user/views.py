@@ -1,8 +1,10 @@
+from django.contrib.auth import get_user_model
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 
+from planetarium_service.db.replicas import use_primary
 from user.serializers import UserSerializer
 
 
@@ -20,4 +22,7 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
-        return self.request.user
+        # request.user only holds the cached fields of the token's user,
+        # saving it could write back outdated ones
+        with use_primary():
+            return get_user_model().objects.get(pk=self.request.user.pk)